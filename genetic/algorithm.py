@@ -3,13 +3,17 @@ from itertools import count, imap, chain
 
 from genetic.crossover.single_point import SinglePointCrossover
 from genetic.decoding.binary import BinaryDecoding
+from genetic.decoding.incremental import ChangeLog, IncrementalDecoding
 from genetic.decoding.real_number import RealNumberDecoding
 from genetic.elitism.elitism import Elitism
 from genetic.initialization.binary import BinaryInitialization
 from genetic.initialization.real_number import RealNumberInitialization
 from genetic.mutation.binary import BinaryMutation
 from genetic.mutation.creep import CreepMutation
+from genetic.population import MatrixPopulation, population_matrix_from_list, population_list_from_matrix, column_views, \
+    batch_initialize, batch_decode, batch_select, batch_cross, batch_mutate, batch_elitism
 from genetic.selection.tournament import TournamentSelection
+from genetic.timing import PhaseTimer, DECODE, EVALUATE, SELECT, CROSS, MUTATE, ELITISM, CALLBACK
 from stats import *
 
 import random
@@ -19,15 +23,36 @@ import random
 #np.random.seed(random_seed)
 #random.seed(random_seed)
 
-def extract_function(function_or_object_with_function, function_name):
+def extract_function(function_or_object_with_function, function_name, optional=False):
+    """
+    Returns the function with the specified name if the object has one, and otherwise the object itself,
+    or None if the function is optional
+    """
     x = function_or_object_with_function
+    if optional:
+        return getattr(x, function_name, None)
     return getattr(x, function_name, x)
 
 class PopulationData:
     """
     Data from a run of a genetic algorithm, containing information about the current population
     """
-    def __init__(self, generation, population, decoded_variable_vectors, fitness_scores, best_individual_index):
+    cache_hits = None # (class defaults for data saved before these were added)
+    cache_misses = None
+    evaluated_fractions = None
+    curriculum_stage = None
+    timings = None
+    evaluation_cost = None
+    saved_evaluation_cost = None
+
+    def __init__(self, generation, population, decoded_variable_vectors, fitness_scores, best_individual_index, cache_hits=None, cache_misses=None, evaluated_fractions=None, curriculum_stage=None, timings=None, evaluation_cost=None, saved_evaluation_cost=None):
+        """
+        :param evaluated_fractions: if some fitness scores are partial (see RacingFitnessFunction), the fraction of the evaluation each fitness score is based on, where 1.0 means complete
+        :param curriculum_stage: the index of the stage of the CurriculumScheduler that the generation was evaluated in, if any
+        :param timings: the PhaseTimings of the generation if the genetic algorithm was run with timing=True
+        :param evaluation_cost: the cost of evaluating the generation, if the fitness function reports it (see RacingFitnessFunction), for instance in simulation timesteps
+        :param saved_evaluation_cost: the (estimated) cost of the evaluations that the fitness function skipped in the generation
+        """
         self.generation = generation
         self.population = population
         self.decoded_variable_vectors = decoded_variable_vectors
@@ -36,6 +61,13 @@ class PopulationData:
         self.best_individual_genes = population[best_individual_index]
         self.best_variables = decoded_variable_vectors[self.best_individual_index]
         self.best_fitness = fitness_scores[best_individual_index]
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.evaluated_fractions = evaluated_fractions
+        self.curriculum_stage = curriculum_stage
+        self.timings = timings
+        self.evaluation_cost = evaluation_cost
+        self.saved_evaluation_cost = saved_evaluation_cost
 
 class PrunedPopulationData:
     """
@@ -47,6 +79,86 @@ class PrunedPopulationData:
         self.best_individual_index = population_data.best_individual_index
         self.best_variables = population_data.best_variables
         self.best_fitness = population_data.best_fitness
+        self.cache_hits = population_data.cache_hits
+        self.cache_misses = population_data.cache_misses
+        self.evaluated_fractions = population_data.evaluated_fractions
+        self.curriculum_stage = population_data.curriculum_stage
+        self.timings = population_data.timings
+        self.evaluation_cost = population_data.evaluation_cost
+        self.saved_evaluation_cost = population_data.saved_evaluation_cost
+
+
+
+def is_fully_evaluated((fitness, evaluated_fraction)):
+    return evaluated_fraction >= 1.0
+
+
+class PopulationView:
+    """
+    A lightweight view of a generation, yielded by GeneticAlgorithm.iterate, with the same attributes as PopulationData,
+    except that the decoded variable vectors, the best variables and the best individual's genes are only created
+    when they are accessed, as views of the buffers of the algorithm, which are reused in later generations
+    """
+    def __init__(self, generation, population, decoded_variable_vectors, decoded_variables, fitness_scores, best_individual_index, cache_hits=None, cache_misses=None, evaluated_fractions=None, curriculum_stage=None, timings=None, evaluation_cost=None, saved_evaluation_cost=None):
+        """
+        :param decoded_variable_vectors: a list of column vectors with the variable values, or None to create it from decoded_variables
+        :param decoded_variables: a matrix with the variable values of one individual per row, or None
+        """
+        self.generation = generation
+        self.population = population
+        self.decoded_variables = decoded_variables
+        self.fitness_scores = fitness_scores
+        self.best_individual_index = best_individual_index
+        self.best_fitness = fitness_scores[best_individual_index]
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.evaluated_fractions = evaluated_fractions
+        self.curriculum_stage = curriculum_stage
+        self.timings = timings
+        self.evaluation_cost = evaluation_cost
+        self.saved_evaluation_cost = saved_evaluation_cost
+        self._decoded_variable_vectors = decoded_variable_vectors
+
+    @property
+    def decoded_variable_vectors(self):
+        if self._decoded_variable_vectors is None:
+            self._decoded_variable_vectors = column_views(self.decoded_variables)
+        return self._decoded_variable_vectors
+
+    @property
+    def best_variables(self):
+        if self._decoded_variable_vectors is None:
+            return self.decoded_variables[self.best_individual_index][:, np.newaxis]
+        return self._decoded_variable_vectors[self.best_individual_index]
+
+    @property
+    def best_individual_genes(self):
+        return self.population[self.best_individual_index]
+
+    def population_data(self):
+        """
+        :return: a PopulationData referring to the same buffers
+        """
+        return PopulationData(self.generation, self.population, self.decoded_variable_vectors, self.fitness_scores, self.best_individual_index,
+                              self.cache_hits, self.cache_misses, self.evaluated_fractions, self.curriculum_stage, self.timings,
+                              self.evaluation_cost, self.saved_evaluation_cost)
+
+    def snapshot(self):
+        """
+        :return: a PopulationData with copies of the population, decoded variables and fitness scores, which stays valid
+        """
+        if isinstance(self.population, list):
+            population = [np.copy(chromosome) for chromosome in self.population]
+        else:
+            population = np.copy(self.population)
+        if self._decoded_variable_vectors is None:
+            decoded_variable_vectors = column_views(np.copy(self.decoded_variables))
+        else:
+            decoded_variable_vectors = [np.copy(vector) for vector in self._decoded_variable_vectors]
+        evaluated_fractions = list(self.evaluated_fractions) if self.evaluated_fractions is not None else None
+        return PopulationData(self.generation, population, decoded_variable_vectors, list(self.fitness_scores), self.best_individual_index,
+                              self.cache_hits, self.cache_misses, evaluated_fractions, self.curriculum_stage, self.timings,
+                              self.evaluation_cost, self.saved_evaluation_cost)
 
 
 
@@ -55,35 +167,99 @@ class GeneticAlgorithm:
     Chromosomes are stored as numpy column vectors,
     and the population is stored as a list of chromosomes.
 
+    Alternatively, with matrix_population=True, the population is stored as a MatrixPopulation,
+    i.e. one row per chromosome in a 2-D array, and the offspring are written into a second preallocated array
+    that swaps roles with the first one each generation. The operators are then called through their batch
+    functions (see genetic.population) where they have them, and through adapters for the per-chromosome functions
+    otherwise. Note that the population in the PopulationData then refers to one of the two arrays, which is
+    overwritten two generations later, so it must be copied if it is to be kept longer than that.
+
+    With incremental_decoding=True, the operators that have a change_log attribute report how each new chromosome
+    was formed from the previous generation to a ChangeLog, so that only the variables that may have changed
+    need to be decoded (see genetic.decoding.incremental). Chromosomes formed by operators that do not report
+    their changes are decoded entirely.
+
     The crossover algorithm is itself responsible
     for the decision of whether crossover should take place,
     for instance with a specified crossover_probability,
     and otherwise simply returns (copies of) the chromosomes in the pair.
     The same is true for the mutation algorithm.
 
+    With timing=True, the wall time of each phase (decoding, evaluation, selection, crossover, mutation, elitism
+    and the callback), the number of evaluations and the number of mutated genes (if the mutation algorithm has
+    an attribute count_mutations) are measured each generation and stored as PhaseTimings in the PopulationData
+    (see genetic.timing). With timing=False, nothing is measured.
+
+    Instead of run with a callback, iterate can be used to loop over the generations, getting a PopulationView
+    of each, which only creates the per-individual data that is accessed.
+
 
     """
-    def __init__(self, population_size, fitness_function, selection_algorithm, crossover_algorithm, mutation_algorithm, elitism_algorithm, decoding_algorithm, initialization_algorithm=None):
+    def __init__(self, population_size, fitness_function, selection_algorithm, crossover_algorithm, mutation_algorithm, elitism_algorithm, decoding_algorithm, initialization_algorithm=None, matrix_population=False, fitness_cache=None, incremental_decoding=False, surrogate_filter=None, curriculum=None, timing=False, metrics_callback=None):
         """
         :param population_size: typically between 30 and 1000 (must be even)
-        :param fitness_function: function, or object with function, evaluate(variables, generation) returning the fitness score
-        :param selection_algorithm: function, or object with function, select(fitness_scores, generation) returning the selected chromosome
+        :param fitness_function: function, or object with function, evaluate(variables, generation) returning the fitness score. If the object also has a function evaluate_batch(decoded_variables, generation), taking a matrix with the variable values of one individual per row and returning an array with the fitness scores, the whole generation is evaluated at once using that function instead. If the object then also has an attribute evaluated_fractions (see RacingFitnessFunction), these are stored in the PopulationData, and likewise the costs returned by a function evaluation_costs(generation).
+        :param selection_algorithm: function, or object with function, select(fitness_scores, generation) returning the selected chromosome. If the object also has a function select_batch(fitness_scores, number_of_selections, generation), all the parents of a generation are selected at once using that function instead.
         :param crossover_algorithm: function, or object with function, cross(pair, generation) returning the resulting crossed pair (if unchanged, return COPIES, not the original vectors)
         :param mutation_algorithm: function, or object with function, mutate(chromosome, generation) modifying the chromosome in-place
         :param elitism_algorithm: function, or object with function, elitism(population, best_individual, generation) modifying the population in-place
         :param decoding_algorithm: function, or object with function, decode(chromosome) returning a column vector of variable values
         :param initialization_algorithm: function, or object with function, initialize_chromosome() returning a new chromosome. If a population is to be specified to the run function, this is not needed.
+        :param matrix_population: if the population should be stored as a MatrixPopulation instead of a list of chromosomes
+        :param fitness_cache: an optional FitnessCache, used to evaluate each distinct chromosome only once
+        :param incremental_decoding: if the decoded variables of the previous generation should be reused where the chromosomes are unchanged, which requires a decoding algorithm with a function decode_variables(chromosome, variable_indices)
+        :param surrogate_filter: an optional SurrogateFilter, used to skip the evaluation of individuals that a surrogate model predicts to be bad
+        :param curriculum: an optional CurriculumScheduler, whose current stage the fitness function uses, which is updated with the best fitness after each generation
+        :param timing: if the phases of each generation should be timed
+        :param metrics_callback: an optional function metrics_callback(timings) called with the PhaseTimings of each generation (before the generation callback), which requires timing=True
         """
         self.population_size = population_size
         if population_size % 2 == 1:
             raise ValueError('The population size must be even!')
         self.evaluate = extract_function(fitness_function, "evaluate")
+        self.evaluate_batch = extract_function(fitness_function, "evaluate_batch", optional=True)
+        self.fitness_function = fitness_function
+        self.fitness_function_reports_evaluated_fractions = self.evaluate_batch is not None and hasattr(fitness_function, "evaluated_fractions")
+        self.evaluation_costs = extract_function(fitness_function, "evaluation_costs", optional=True) if self.evaluate_batch is not None else None
+        self.surrogate_filter = surrogate_filter
+        self.curriculum = curriculum
+        self.reports_evaluated_fractions = self.fitness_function_reports_evaluated_fractions or surrogate_filter is not None
         self.select = extract_function(selection_algorithm, "select")
+        self.select_batch = extract_function(selection_algorithm, "select_batch", optional=True)
         self.cross = extract_function(crossover_algorithm, "cross")
         self.mutate = extract_function(mutation_algorithm, "mutate")
         self.elitism = extract_function(elitism_algorithm, "elitism")
         self.decode = extract_function(decoding_algorithm, "decode")
         self.initialize_chromosome = extract_function(initialization_algorithm, "initialize_chromosome")
+        self.matrix_population = matrix_population
+        self.fitness_cache = fitness_cache
+        self.change_log = None
+        if incremental_decoding:
+            self.change_log = ChangeLog()
+            self.incremental_decoding = IncrementalDecoding(decoding_algorithm)
+            for operator in (crossover_algorithm, mutation_algorithm, elitism_algorithm):
+                if hasattr(operator, "change_log"):
+                    operator.change_log = self.change_log
+            self.mutation_reports_changes = hasattr(mutation_algorithm, "change_log")
+            self.elitism_reports_changes = hasattr(elitism_algorithm, "change_log")
+        if matrix_population:
+            self.initialize_population = extract_function(initialization_algorithm, "initialize_population", optional=True) or batch_initialize(self.initialize_chromosome)
+            self.decode_batch = extract_function(decoding_algorithm, "decode_batch", optional=True) or batch_decode(self.decode)
+            self.select_batch = self.select_batch or batch_select(self.select)
+            self.cross_batch = extract_function(crossover_algorithm, "cross_batch", optional=True) or batch_cross(self.cross, self.change_log)
+            self.mutate_batch = extract_function(mutation_algorithm, "mutate_batch", optional=True) or batch_mutate(self.mutate, self.change_log)
+            self.elitism_batch = extract_function(elitism_algorithm, "elitism_batch", optional=True) or batch_elitism(self.elitism)
+        if metrics_callback is not None and not timing:
+            raise ValueError('A metrics callback requires timing=True!')
+        self.metrics_callback = metrics_callback
+        self.timer = None
+        if timing:
+            if hasattr(mutation_algorithm, "count_mutations"):
+                mutation_algorithm.count_mutations = True
+                self.timer = PhaseTimer(mutation_algorithm)
+            else:
+                self.timer = PhaseTimer()
+            self.time_operators()
 
     def run(self, num_generations=None, generation_callback=None, population_data=None):
         """
@@ -92,13 +268,39 @@ class GeneticAlgorithm:
         :param population_data: if None, a new population is initialized using the specified initialization_algorithm. Otherwise, the population in the specified population data is used.
         :return: an instance of PopulationData with information about the final population
         """
+        data = None
+        for view in self.iterate(num_generations, population_data):
+            data = view.population_data()
+            if generation_callback is not None and generation_callback(data) is False:
+                break
+        return data
+
+    def iterate(self, num_generations=None, population_data=None):
+        """
+        A generator yielding a PopulationView of each generation, which refers to the buffers of the algorithm,
+        so it is only valid until the next generation is requested (use snapshot() to keep it).
+        As with the callback of run, the population may be modified in-place before the next generation is requested.
+        :param num_generations: the number of generations, or None to continue indefinitely
+        :param population_data: if None, a new population is initialized using the specified initialization_algorithm. Otherwise, the population in the specified population data is used.
+        """
         # Initialize population
         if population_data is None:
-            population = [self.initialize_chromosome() for i in range(self.population_size)]
+            if self.matrix_population:
+                population = self.initialize_population(self.population_size)
+            else:
+                population = [self.initialize_chromosome() for i in range(self.population_size)]
             generation = 1
         else:
-            population = population_data.population
+            population = self.convert_population(population_data.population)
             generation = population_data.generation
+            if self.curriculum is not None:
+                self.curriculum.resume(population_data.curriculum_stage)
+        if self.matrix_population:
+            matrix_population = MatrixPopulation(population)
+        previous_decoded_variables = None
+        timer = self.timer
+        if timer is not None:
+            timer.reset()
 
         while True:
 
@@ -108,42 +310,193 @@ class GeneticAlgorithm:
                 # Use stored data first time if supplied
 
                 decoded_variable_vectors, fitness_scores, best_individual_index, best_individual = self.use_population_data(population_data)
+                decoded_variables = None
                 population_data = None
 
             else:
 
                 # Evaluate population
 
-                decoded_variable_vectors = map(self.decode, population)
-                fitness_scores = [self.evaluate(vector, generation) for vector in decoded_variable_vectors]
+                if timer is not None:
+                    timer.start()
+                if self.change_log is not None and previous_decoded_variables is not None:
+                    decoded_variables = self.incremental_decoding.decode_population(population, self.change_log, previous_decoded_variables)
+                    decoded_variable_vectors = None # (views of decoded_variables, created when needed)
+                elif self.matrix_population:
+                    decoded_variables = self.decode_batch(population)
+                    decoded_variable_vectors = None
+                else:
+                    decoded_variable_vectors = map(self.decode, population)
+                    decoded_variables = None
+                if timer is not None:
+                    timer.stop(DECODE)
+                evaluate_individuals = lambda indices: self.evaluate_individuals(indices, decoded_variable_vectors, decoded_variables, generation)
+                if self.surrogate_filter is not None:
+                    evaluate_individuals = self.surrogate_filter.prefilter(evaluate_individuals,
+                                                                           decoded_variables if decoded_variables is not None else population_matrix_from_list(decoded_variable_vectors),
+                                                                           generation)
+                if self.fitness_cache is not None:
+                    fitness_scores = self.fitness_cache.evaluate_population(population, evaluate_individuals, generation,
+                                                                            is_fully_evaluated if self.reports_evaluated_fractions else None)
+                else:
+                    fitness_scores = evaluate_individuals(None)
+                if self.reports_evaluated_fractions:
+                    fitness_scores, evaluated_fractions = map(list, zip(*fitness_scores))
+                else:
+                    evaluated_fractions = None
                 best_individual_index = max(xrange(len(fitness_scores)), key=fitness_scores.__getitem__)
                 best_individual = np.copy(population[best_individual_index])
-
-
-                # Call optional callback function and check if finished
-
-                data = PopulationData(generation, population, decoded_variable_vectors, fitness_scores, best_individual_index)
-                if (generation_callback is not None and generation_callback(data) is False) or generation == num_generations:
-                    return data
+                if timer is not None:
+                    timer.stop(EVALUATE)
+
+
+                # Yield the generation and check if finished
+
+                curriculum_stage = self.curriculum.stage_index if self.curriculum is not None else None
+                timings = timer.collect(generation) if timer is not None else None
+                evaluation_cost, saved_evaluation_cost = self.evaluation_costs(generation) if self.evaluation_costs is not None else (None, None)
+                if self.fitness_cache is not None:
+                    view = PopulationView(generation, population, decoded_variable_vectors, decoded_variables, fitness_scores, best_individual_index,
+                                          self.fitness_cache.hits, self.fitness_cache.misses, evaluated_fractions, curriculum_stage, timings,
+                                          evaluation_cost, saved_evaluation_cost)
+                else:
+                    view = PopulationView(generation, population, decoded_variable_vectors, decoded_variables, fitness_scores, best_individual_index,
+                                          evaluated_fractions=evaluated_fractions, curriculum_stage=curriculum_stage, timings=timings,
+                                          evaluation_cost=evaluation_cost, saved_evaluation_cost=saved_evaluation_cost)
+                if self.metrics_callback is not None:
+                    self.metrics_callback(timings)
+                yield view
+                if timer is not None:
+                    timer.stop(CALLBACK)
+                if generation == num_generations:
+                    return
+                if self.curriculum is not None:
+                    self.curriculum.update(generation, view.best_fitness)
 
 
 
             # Form the next generation
 
-            selected_pairs_indices = ([self.select(fitness_scores, generation) for _ in range(2)] for i in range(len(population)/2))
+            if self.change_log is not None:
+                # (copied after the callback, which may have replaced individuals, for instance with migrants)
+                if decoded_variables is not None:
+                    previous_decoded_variables = np.copy(decoded_variables)
+                else:
+                    previous_decoded_variables = population_matrix_from_list(decoded_variable_vectors)
+                self.change_log.start_generation(len(population), best_individual_index)
+            if self.matrix_population:
+                self.form_next_generation(matrix_population, fitness_scores, best_individual, generation)
+                population = matrix_population.current
+            else:
+                if self.select_batch is not None:
+                    selected_pairs_indices = np.reshape(self.select_batch(fitness_scores, len(population), generation), (-1, 2))
+                else:
+                    selected_pairs_indices = ([self.select(fitness_scores, generation) for _ in range(2)] for i in range(len(population)/2))
+                population = self.form_next_generation_list(population, selected_pairs_indices, generation)
+                for i, chromosome in enumerate(population):
+                    if self.change_log is not None:
+                        self.change_log.current_index = i
+                    self.mutate(chromosome, generation)
+                self.mutation_done()
+                self.elitism(population, best_individual, generation)
+                self.elitism_done()
+            generation += 1
+
+    def evaluate_individuals(self, indices, decoded_variable_vectors, decoded_variables, generation):
+        """
+        Returns the fitness scores of the individuals with the specified indices, or of all individuals if indices is None,
+        as pairs of (fitness, evaluated fraction) if evaluated fractions are reported
+        """
+        if self.evaluate_batch is not None:
+            if decoded_variables is None:
+                decoded_variables = population_matrix_from_list(decoded_variable_vectors)
+            if indices is not None:
+                decoded_variables = decoded_variables[indices]
+            fitness_scores = list(np.ravel(self.evaluate_batch(decoded_variables, generation)))
+        else:
+            if decoded_variable_vectors is None:
+                decoded_variable_vectors = column_views(decoded_variables)
+            if indices is not None:
+                decoded_variable_vectors = map(decoded_variable_vectors.__getitem__, indices)
+            fitness_scores = [self.evaluate(vector, generation) for vector in decoded_variable_vectors]
+        if self.timer is not None:
+            self.timer.number_of_evaluations += len(fitness_scores)
+        if self.reports_evaluated_fractions:
+            # (paired with the scores, so that the fractions are cached together with them)
+            if self.fitness_function_reports_evaluated_fractions:
+                return zip(fitness_scores, self.fitness_function.evaluated_fractions)
+            return [(fitness, 1.0) for fitness in fitness_scores]
+        return fitness_scores
+
+    def form_next_generation(self, matrix_population, fitness_scores, best_individual, generation):
+        """
+        Writes the next generation into the spare array of the MatrixPopulation and swaps the arrays
+        """
+        number_of_pairs = len(matrix_population.current) / 2
+        parent_indices = np.reshape(self.select_batch(fitness_scores, 2 * number_of_pairs, generation), (number_of_pairs, 2))
+        self.cross_batch(matrix_population.current, parent_indices, matrix_population.spare, generation)
+        matrix_population.swap()
+        self.mutate_batch(matrix_population.current, generation)
+        self.mutation_done()
+        self.elitism_batch(matrix_population.current, best_individual, generation)
+        self.elitism_done()
+
+    def form_next_generation_list(self, population, selected_pairs_indices, generation):
+        """
+        Returns a list with the crossed pairs of chromosomes with the selected indices
+        """
+        if self.change_log is None:
             selected_pairs = (map(population.__getitem__, pair) for pair in selected_pairs_indices)
             crossed_pairs = (self.cross(pair, generation) for pair in selected_pairs)
-            population = list(chain.from_iterable(crossed_pairs))
-            for chromosome in population:
-                self.mutate(chromosome, generation)
-            self.elitism(population, best_individual, generation)
-            generation += 1
+            return list(chain.from_iterable(crossed_pairs))
+        next_population = []
+        for k, (i, j) in enumerate(selected_pairs_indices):
+            self.change_log.current_pair = (2 * k, 2 * k + 1, i, j)
+            next_population.extend(self.cross([population[i], population[j]], generation))
+        return next_population
+
+    def time_operators(self):
+        """
+        Replaces the operator functions that are called when forming the next generation with ones that add their time to the timer
+        """
+        if self.matrix_population:
+            self.select_batch = self.timer.timed(SELECT, self.select_batch)
+            self.cross_batch = self.timer.timed(CROSS, self.cross_batch)
+            self.mutate_batch = self.timer.timed(MUTATE, self.mutate_batch)
+            self.elitism_batch = self.timer.timed(ELITISM, self.elitism_batch)
+        else:
+            self.select = self.timer.timed(SELECT, self.select)
+            if self.select_batch is not None:
+                self.select_batch = self.timer.timed(SELECT, self.select_batch)
+            self.cross = self.timer.timed(CROSS, self.cross)
+            self.mutate = self.timer.timed(MUTATE, self.mutate)
+            self.elitism = self.timer.timed(ELITISM, self.elitism)
+
+    def mutation_done(self):
+        if self.change_log is not None and not self.mutation_reports_changes:
+            self.change_log.forget()
+
+    def elitism_done(self):
+        if self.change_log is not None and not self.elitism_reports_changes:
+            self.change_log.forget()
+
+    def convert_population(self, population):
+        """
+        Returns the population in the representation used by this algorithm,
+        so that populations saved using either representation can be loaded
+        """
+        if self.matrix_population and isinstance(population, list):
+            return population_matrix_from_list(population)
+        if not self.matrix_population and not isinstance(population, list):
+            return population_list_from_matrix(population)
+        return population
 
     def use_population_data(self, population_data):
+        best_individual = np.copy(population_data.best_individual_genes)
         return population_data.decoded_variable_vectors,\
         population_data.fitness_scores,\
         population_data.best_individual_index,\
-        np.copy(population_data.best_individual_genes)
+        np.ravel(best_individual) if self.matrix_population else best_individual.reshape(-1, 1)
 
 
 
@@ -153,7 +506,15 @@ if __name__ == "__main__":
 
     g = lambda x: (1 + (x[0] + x[1] + 1) ** 2 * (19 - 14 * x[0] + 3 * x[0] ** 2 - 14 * x[1] + 6 * x[0] * x[1] + 3 * x[1] ** 2))\
                  *(30 + (2 * x[0] - 3 * x[1]) ** 2 * (18 - 32 * x[0] + 12 * x[0] ** 2 + 48 * x[1] - 36 * x[0] * x[1] + 27 * x[1] ** 2))
-    fitness_function = lambda x,generation: 1.0 / g(x)
+
+    class GoldsteinPriceFitness:
+        def evaluate(self, variables, generation):
+            return 1.0 / g(variables)
+
+        def evaluate_batch(self, decoded_variables, generation):
+            return 1.0 / g(decoded_variables.T)
+
+    fitness_function = GoldsteinPriceFitness()
 
     vars = 2
     var_size = 30
@@ -166,13 +527,15 @@ if __name__ == "__main__":
                           BinaryMutation(7.0 / m),
                           Elitism(1),
                           BinaryDecoding(5, vars, var_size),
-                          BinaryInitialization(m))
+                          BinaryInitialization(m),
+                          timing=True)
 
 
     def callback(p):
         if p.generation == 100:
             print str(p.generation) + ": " + str(p.best_fitness)
             print p.best_variables
+            print p.timings
 
 
     ga.run(100, callback)
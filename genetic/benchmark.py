@@ -0,0 +1,296 @@
+"""
+Microbenchmarks of the genetic operators, run with
+
+    python -m genetic.benchmark --output results.json [--compare previous_results.json]
+
+Each case (an operator at a population size and chromosome length) is run in a fresh process with fixed seeds,
+so that the peak memory (the increase of the maximum resident set size during the case) can be measured,
+and the results are saved as JSON, so that the results of two commits can be compared.
+
+Each operator is timed both through its per-chromosome function (select, cross, mutate, decode or elitism, called
+as many times as GeneticAlgorithm with a list population does in one generation) and through its batch function.
+The per-chromosome cases only use functions that the operators have always had, so this file can be copied into an
+older checkout to produce results to compare with. Cases that fail there (such as the batch functions before they
+existed) are recorded with the error instead of the times. The cases with more than max_genes genes in the population
+are skipped, and listed in the output, so that results of different grids are not compared by mistake.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import time
+import numpy as np
+
+from genetic.crossover.single_point import SinglePointCrossover
+from genetic.decoding.binary import BinaryDecoding
+from genetic.decoding.real_number import RealNumberDecoding
+from genetic.elitism.elitism import Elitism
+from genetic.mutation.binary import BinaryMutation
+from genetic.mutation.creep import CreepMutation
+from genetic.selection.tournament import TournamentSelection
+
+population_sizes = (30, 300, 3000, 10000)
+chromosome_lengths = (60, 2000, 20000, 200000)
+bits_per_variable = 20 # (divides all the chromosome lengths)
+
+def binary_population(population_size, chromosome_length):
+    return np.random.randint(0, 2, (population_size, chromosome_length)).astype(np.uint8)
+
+def real_population(population_size, chromosome_length):
+    return np.random.random((population_size, chromosome_length))
+
+def binary_chromosomes(population_size, chromosome_length):
+    return [np.random.randint(0, 2, (chromosome_length, 1)) for _ in range(population_size)]
+
+def real_chromosomes(population_size, chromosome_length):
+    return [np.random.random((chromosome_length, 1)) for _ in range(population_size)]
+
+def random_pairs(population_size):
+    return np.random.randint(0, population_size, (population_size / 2, 2))
+
+# Each benchmark takes the population size and chromosome length, and returns a function to time, after setting up its data
+def tournament_selection_per_chromosome(population_size, chromosome_length):
+    selection = TournamentSelection(0.75, 3)
+    fitness_scores = list(np.random.random(population_size))
+    return lambda: [selection.select(fitness_scores, 1) for _ in range(population_size)]
+
+def single_point_crossover_per_chromosome(population_size, chromosome_length):
+    crossover = SinglePointCrossover(0.9)
+    population = binary_chromosomes(population_size, chromosome_length)
+    parent_indices = random_pairs(population_size)
+    return lambda: [crossover.cross((population[a], population[b]), 1) for a, b in parent_indices]
+
+def binary_mutation_per_chromosome(population_size, chromosome_length):
+    mutation = BinaryMutation(1.0 / chromosome_length)
+    population = binary_chromosomes(population_size, chromosome_length)
+    return lambda: [mutation.mutate(chromosome, 1) for chromosome in population]
+
+def creep_mutation_per_chromosome(population_size, chromosome_length):
+    mutation = CreepMutation(1.0 / chromosome_length, 0.8, 0.005)
+    population = real_chromosomes(population_size, chromosome_length)
+    return lambda: [mutation.mutate(chromosome, 1) for chromosome in population]
+
+def binary_decoding_per_chromosome(population_size, chromosome_length):
+    decoding = BinaryDecoding(5, chromosome_length / bits_per_variable, bits_per_variable)
+    population = binary_chromosomes(population_size, chromosome_length)
+    return lambda: [decoding.decode(chromosome) for chromosome in population]
+
+def real_number_decoding_per_chromosome(population_size, chromosome_length):
+    decoding = RealNumberDecoding(5)
+    population = real_chromosomes(population_size, chromosome_length)
+    return lambda: [decoding.decode(chromosome) for chromosome in population]
+
+def elitism_per_chromosome(population_size, chromosome_length):
+    e = Elitism(1)
+    population = binary_chromosomes(population_size, chromosome_length)
+    best_individual = np.copy(population[0])
+    return lambda: e.elitism(population, best_individual, 1)
+
+def tournament_selection(population_size, chromosome_length):
+    selection = TournamentSelection(0.75, 3)
+    fitness_scores = np.random.random(population_size)
+    return lambda: selection.select_batch(fitness_scores, population_size, 1)
+
+def single_point_crossover(population_size, chromosome_length):
+    crossover = SinglePointCrossover(0.9)
+    source = binary_population(population_size, chromosome_length)
+    destination = np.empty_like(source)
+    parent_indices = random_pairs(population_size)
+    return lambda: crossover.cross_batch(source, parent_indices, destination, 1)
+
+def binary_mutation(population_size, chromosome_length):
+    mutation = BinaryMutation(1.0 / chromosome_length)
+    population = binary_population(population_size, chromosome_length)
+    return lambda: mutation.mutate_batch(population, 1)
+
+def sparse_binary_mutation(population_size, chromosome_length):
+    mutation = BinaryMutation(1.0 / chromosome_length, sparse=True)
+    population = binary_population(population_size, chromosome_length)
+    return lambda: mutation.mutate_batch(population, 1)
+
+def creep_mutation(population_size, chromosome_length):
+    mutation = CreepMutation(1.0 / chromosome_length, 0.8, 0.005)
+    population = real_population(population_size, chromosome_length)
+    return lambda: mutation.mutate_batch(population, 1)
+
+def binary_decoding(population_size, chromosome_length):
+    decoding = BinaryDecoding(5, chromosome_length / bits_per_variable, bits_per_variable)
+    population = binary_population(population_size, chromosome_length)
+    return lambda: decoding.decode_batch(population)
+
+def real_number_decoding(population_size, chromosome_length):
+    decoding = RealNumberDecoding(5)
+    population = real_population(population_size, chromosome_length)
+    return lambda: decoding.decode_batch(population)
+
+def elitism(population_size, chromosome_length):
+    e = Elitism(1)
+    population = binary_population(population_size, chromosome_length)
+    best_individual = np.copy(population[0])
+    return lambda: e.elitism_batch(population, best_individual, 1)
+
+# (name, benchmark, if the time depends on the chromosome length)
+benchmarks = [("TournamentSelection.select", tournament_selection_per_chromosome, False),
+              ("SinglePointCrossover.cross", single_point_crossover_per_chromosome, True),
+              ("BinaryMutation.mutate", binary_mutation_per_chromosome, True),
+              ("CreepMutation.mutate", creep_mutation_per_chromosome, True),
+              ("BinaryDecoding.decode", binary_decoding_per_chromosome, True),
+              ("RealNumberDecoding.decode", real_number_decoding_per_chromosome, True),
+              ("Elitism.elitism", elitism_per_chromosome, True),
+              ("TournamentSelection.select_batch", tournament_selection, False),
+              ("SinglePointCrossover.cross_batch", single_point_crossover, True),
+              ("BinaryMutation.mutate_batch", binary_mutation, True),
+              ("BinaryMutation.mutate_batch (sparse)", sparse_binary_mutation, True),
+              ("CreepMutation.mutate_batch", creep_mutation, True),
+              ("BinaryDecoding.decode_batch", binary_decoding, True),
+              ("RealNumberDecoding.decode_batch", real_number_decoding, True),
+              ("Elitism.elitism_batch", elitism, True)]
+
+def get_cases(names=None, max_genes=5*10**7):
+    """
+    :return: two lists of (name, population_size, chromosome_length) for the benchmarks with the specified names (or all):
+    the cases to run, and the skipped cases with more than max_genes genes in the population
+    """
+    cases = []
+    skipped_cases = []
+    for name, _, depends_on_chromosome_length in benchmarks:
+        if names and name not in names:
+            continue
+        for population_size in population_sizes:
+            for chromosome_length in (chromosome_lengths if depends_on_chromosome_length else (None,)):
+                if chromosome_length is None or population_size * chromosome_length <= max_genes:
+                    cases.append((name, population_size, chromosome_length))
+                else:
+                    skipped_cases.append((name, population_size, chromosome_length))
+    return cases, skipped_cases
+
+def peak_memory():
+    """
+    :return: the maximum resident set size of this process so far, in bytes
+    """
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if platform.system() == "Darwin" else 1024 * maxrss
+
+def run_case((name, population_size, chromosome_length, seed, min_time, max_repeats)):
+    """
+    Runs one case, which should be done in a fresh process for the peak memory to be meaningful
+    :return: a dict with the results, or with the error if the operator failed (for instance since it does not have the function in this commit)
+    """
+    start_memory = peak_memory()
+    np.random.seed(seed)
+    random.seed(seed)
+    benchmark = dict((b[0], b[1]) for b in benchmarks)[name]
+    try:
+        function = benchmark(population_size, chromosome_length or 1)
+        function() # (warm-up)
+    except Exception as e:
+        return {"operator": name,
+                "population_size": population_size,
+                "chromosome_length": chromosome_length,
+                "error": type(e).__name__ + ": " + str(e)}
+    times = []
+    while len(times) < 3 or (sum(times) < min_time and len(times) < max_repeats):
+        start_time = time.time()
+        function()
+        times.append(time.time() - start_time)
+    best_time = min(times)
+    number_of_genes = population_size * (chromosome_length or 1)
+    return {"operator": name,
+            "population_size": population_size,
+            "chromosome_length": chromosome_length,
+            "repeats": len(times),
+            "best_seconds": best_time,
+            "median_seconds": float(np.median(times)),
+            "individuals_per_second": population_size / best_time if best_time > 0 else None,
+            "genes_per_second": number_of_genes / best_time if best_time > 0 and chromosome_length else None,
+            "peak_memory_mb": (peak_memory() - start_memory) / 2.0**20}
+
+def get_metadata(seed, max_genes):
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=open(os.devnull, "w")).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "seed": seed,
+            "max_genes": max_genes}
+
+def run_benchmarks(cases, skipped_cases=(), max_genes=None, seed=0, min_time=0.5, max_repeats=100, verbose=True):
+    """
+    Runs each case in a new process
+    :param skipped_cases: the cases skipped by get_cases, which are listed in the results
+    :return: a dict with the metadata, a list of results and a list of the skipped cases
+    """
+    if verbose and skipped_cases:
+        print "Skipping " + str(len(skipped_cases)) + " cases with more than " + str(max_genes) + " genes in the population: " + \
+              ", ".join(sorted(set(str(population_size) + " x " + str(chromosome_length) for _, population_size, chromosome_length in skipped_cases),
+                               key=lambda size: map(int, size.split(" x ")))) + " (of each operator)"
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    results = []
+    try:
+        for case in cases:
+            result = pool.apply(run_case, ((case + (seed, min_time, max_repeats)),))
+            if verbose:
+                print format_result(result)
+            results.append(result)
+    finally:
+        pool.terminate()
+    return {"metadata": get_metadata(seed, max_genes),
+            "results": results,
+            "skipped": [{"operator": name, "population_size": population_size, "chromosome_length": chromosome_length}
+                        for name, population_size, chromosome_length in skipped_cases]}
+
+def format_result(result, previous_result=None):
+    if "error" in result:
+        return result["operator"] + " " + str(result["population_size"]) + " x " + str(result["chromosome_length"]) + ": failed (" + result["error"] + ")"
+    text = result["operator"] + " " + str(result["population_size"]) + " x " + str(result["chromosome_length"]) + ": " + \
+           "%.3g" % (1000 * result["best_seconds"]) + " ms, " + \
+           ("%.3g" % result["individuals_per_second"] if result["individuals_per_second"] is not None else "too fast to measure") + " individuals/s, " + \
+           "%.1f" % result["peak_memory_mb"] + " MB"
+    if previous_result is not None and "error" not in previous_result and result["best_seconds"] > 0:
+        text += ", " + "%.2f" % (previous_result["best_seconds"] / result["best_seconds"]) + " times as fast as before"
+    return text
+
+def compare(results, previous_results):
+    """
+    :return: a text with one line per case that is in both results, and a line about the cases that are only in one of them
+    """
+    key = lambda result: (result["operator"], result["population_size"], result["chromosome_length"])
+    previous = dict((key(result), result) for result in previous_results["results"])
+    current = dict((key(result), result) for result in results["results"])
+    lines = [format_result(result, previous[key(result)]) for result in results["results"] if key(result) in previous]
+    only_current = [k for k in current if k not in previous]
+    only_previous = [k for k in previous if k not in current]
+    if only_current or only_previous:
+        lines.append("Not compared (different grids or operators): " + str(len(only_current)) + " cases only in these results, " +
+                     str(len(only_previous)) + " cases only in the previous results")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the genetic operators")
+    parser.add_argument("--output", help="the JSON file to save the results in")
+    parser.add_argument("--compare", help="a JSON file with previous results to compare with")
+    parser.add_argument("--operator", action="append", help="the name of an operator to benchmark (may be repeated), by default all")
+    parser.add_argument("--max-genes", type=int, default=5*10**7, help="the largest population (in genes) to benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.5, help="the minimum time in seconds to repeat each case")
+    args = parser.parse_args()
+
+    cases, skipped_cases = get_cases(args.operator, args.max_genes)
+    results = run_benchmarks(cases, skipped_cases, args.max_genes, args.seed, args.min_time)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            previous_results = json.load(f)
+        print "\nCompared with commit " + str(previous_results["metadata"]["commit"]) + ":"
+        print compare(results, previous_results)
@@ -0,0 +1,42 @@
+import numpy as np
+
+def cross_with_swap_mask(source, parent_indices, destination, swap_mask, scratch=None):
+    """
+    Writes the children of the pair parent_indices[k] into rows k and k + len(parent_indices) of the destination matrix,
+    where the first child gets the genes of the first parent and the second child those of the second parent,
+    except where swap_mask[k] is True, where the genes are exchanged.
+    :param scratch: an optional array with the shape of half the destination matrix, which is reused if possible
+    :return: the scratch array, which may be passed to the next call
+    """
+    number_of_pairs = len(parent_indices)
+    first_children = destination[:number_of_pairs]
+    second_children = destination[number_of_pairs:2 * number_of_pairs]
+    np.take(source, parent_indices[:, 0], axis=0, out=first_children, mode='clip')
+    np.take(source, parent_indices[:, 1], axis=0, out=second_children, mode='clip')
+    if scratch is None or scratch.shape != first_children.shape or scratch.dtype != first_children.dtype:
+        scratch = np.empty_like(first_children)
+    np.copyto(scratch, first_children, where=swap_mask)
+    np.copyto(first_children, second_children, where=swap_mask)
+    np.copyto(second_children, scratch, where=swap_mask)
+    return scratch
+
+def cross_with_byte_mask(source, parent_indices, destination, byte_mask):
+    """
+    Like cross_with_swap_mask, but for bit-packed chromosomes, exchanging the bits selected by a uint8 mask
+    using bytewise operations
+    """
+    number_of_pairs = len(parent_indices)
+    first_children = destination[:number_of_pairs]
+    second_children = destination[number_of_pairs:2 * number_of_pairs]
+    np.take(source, parent_indices[:, 0], axis=0, out=first_children, mode='clip')
+    np.take(source, parent_indices[:, 1], axis=0, out=second_children, mode='clip')
+    difference = np.bitwise_xor(first_children, second_children)
+    difference &= byte_mask
+    first_children ^= difference
+    second_children ^= difference
+
+def crossover_decisions(crossover_probability, number_of_pairs):
+    """
+    :return: a boolean array telling for each pair whether crossover should take place
+    """
+    return np.random.random(number_of_pairs) < crossover_probability
@@ -0,0 +1,58 @@
+import numpy as np
+import random
+
+from genetic.crossover.batch import crossover_decisions
+
+class BlendCrossover:
+    """
+    Blend crossover (BLX-alpha) for real-coded chromosomes with genes between 0 and 1 (see RealNumberDecoding):
+    each gene of each child is drawn uniformly from the interval between the genes of the parents, extended by alpha
+    times its width on both sides, and clipped to [0, 1]. With alpha=0, this is arithmetic crossover with
+    a random weight for each gene. The children have the data type of the parents.
+    """
+    def __init__(self, crossover_probability, alpha=0.5):
+        """
+        :param crossover_probability: typically between 0.7 and 1
+        :param alpha: how far outside the interval between the parents' genes the children's genes may be, typically 0.5
+        """
+        self.crossover_probability = crossover_probability
+        self.alpha = alpha
+
+    def cross(self, (a, b), generation):
+        if random.random() < self.crossover_probability:
+            first_child, second_child = self.blend(a, b)
+            return first_child, second_child
+        else:
+            return (np.copy(a), np.copy(b)) # important to return COPIES, not the original
+
+    def cross_batch(self, source, parent_indices, destination, generation):
+        number_of_pairs = len(parent_indices)
+        first_children = destination[:number_of_pairs]
+        second_children = destination[number_of_pairs:2 * number_of_pairs]
+        np.take(source, parent_indices[:, 0], axis=0, out=first_children, mode='clip')
+        np.take(source, parent_indices[:, 1], axis=0, out=second_children, mode='clip')
+        crossed = crossover_decisions(self.crossover_probability, number_of_pairs)
+        first_children[crossed], second_children[crossed] = self.blend(first_children[crossed], second_children[crossed])
+
+    def blend(self, a, b):
+        """
+        :return: an array with the genes of the first child in [0] and of the second child in [1]
+        """
+        width = np.abs(a - b)
+        lower = np.minimum(a, b) - self.alpha * width
+        children = lower + (1 + 2 * self.alpha) * width * np.random.random((2,) + a.shape)
+        np.clip(children, 0, 1, out=children)
+        return children.astype(a.dtype, copy=False)
+
+
+if __name__ == "__main__":
+    a = np.array([[0.1], [0.2], [0.3], [0.4]], dtype=np.float32)
+    b = np.array([[0.5], [0.5], [0.5], [0.5]], dtype=np.float32)
+    c = BlendCrossover(1.0)
+    new_a, new_b = c.cross((a, b), 1)
+    print new_a
+    print new_b
+    source = np.hstack((a, b)).T
+    destination = np.empty((2, 4), dtype=np.float32)
+    c.cross_batch(source, np.array([[0, 1]]), destination, 1)
+    print destination
@@ -1,28 +1,69 @@
 import numpy as np
 import random
 
+from genetic.crossover.batch import cross_with_swap_mask, cross_with_byte_mask, crossover_decisions
+from genetic.packing import single_point_byte_mask
+
 class SinglePointCrossover:
-   def __init__(self, crossover_probability):
+   def __init__(self, crossover_probability, chromosome_length=None, packed=False):
         """
         :param crossover_probability: typically between 0.7 and 1
+        :param chromosome_length: the number of bits in a chromosome if the chromosomes are bit-packed. If not specified, the padding bits in the last byte are counted as well.
+        :param packed: if the chromosomes are bit-packed (see genetic.packing)
         """
         self.crossover_probability = crossover_probability
+        self.chromosome_length = chromosome_length
+        self.packed = packed
+        self.scratch = None
+        self.change_log = None
 
    def cross(self, (a,b), generation):
         if random.random() < self.crossover_probability:
+            if self.packed:
+                chromosome_length = self.chromosome_length or 8 * len(a)
+                crossover_point = random.randint(1, chromosome_length-1)
+                difference = (a ^ b) & single_point_byte_mask(crossover_point, len(a)).reshape(a.shape)
+                if self.change_log is not None:
+                    self.change_log.crossed_current_pair(crossover_point)
+                return (a ^ difference, b ^ difference)
             chromosome_length = len(a)
             crossover_point = random.randint(1, chromosome_length-1)
+            if self.change_log is not None:
+                self.change_log.crossed_current_pair(crossover_point)
             return (
                 np.vstack((a[:crossover_point], b[crossover_point:])),
                 np.vstack((b[:crossover_point], a[crossover_point:]))
             )
         else:
+            if self.change_log is not None:
+                self.change_log.crossed_current_pair(None)
             return (np.copy(a),np.copy(b)) # important to return COPIES, not the original
 
+   def cross_batch(self, source, parent_indices, destination, generation):
+        number_of_pairs = len(parent_indices)
+        packed = self.packed
+        if packed:
+            chromosome_length = self.chromosome_length or 8 * source.shape[1]
+        else:
+            chromosome_length = source.shape[1]
+        crossover_points = np.random.randint(1, chromosome_length, number_of_pairs)
+        crossover_points[~crossover_decisions(self.crossover_probability, number_of_pairs)] = chromosome_length # no genes swapped
+        if packed:
+            cross_with_byte_mask(source, parent_indices, destination, single_point_byte_mask(crossover_points, source.shape[1]))
+        else:
+            swap_mask = np.arange(chromosome_length) >= crossover_points[:, np.newaxis]
+            self.scratch = cross_with_swap_mask(source, parent_indices, destination, swap_mask, self.scratch)
+        if self.change_log is not None:
+            self.change_log.crossed_batch(parent_indices, crossover_points, chromosome_length)
+
 if __name__ == "__main__":
     a = np.array([[1], [2], [3],[4]])
     b = np.array([[100], [200], [300],[400]])
     c = SinglePointCrossover(0.8)
     new_a, new_b = c.cross((a,b), 1)
     print new_a
-    print new_b
\ No newline at end of file
+    print new_b
+    source = np.hstack((a, b)).T
+    destination = np.empty((4, 4), dtype=int)
+    c.cross_batch(source, np.array([[0, 1], [1, 0]]), destination, 1)
+    print destination
@@ -0,0 +1,44 @@
+import numpy as np
+import random
+
+from genetic.crossover.batch import cross_with_swap_mask, crossover_decisions
+
+class TwoPointCrossover:
+    def __init__(self, crossover_probability):
+        """
+        :param crossover_probability: typically between 0.7 and 1
+        """
+        self.crossover_probability = crossover_probability
+        self.scratch = None
+
+    def cross(self, (a,b), generation):
+        if random.random() < self.crossover_probability:
+            chromosome_length = len(a)
+            first_point, second_point = sorted(random.randint(1, chromosome_length-1) for _ in range(2))
+            return (
+                np.vstack((a[:first_point], b[first_point:second_point], a[second_point:])),
+                np.vstack((b[:first_point], a[first_point:second_point], b[second_point:]))
+            )
+        else:
+            return (np.copy(a),np.copy(b)) # important to return COPIES, not the original
+
+    def cross_batch(self, source, parent_indices, destination, generation):
+        number_of_pairs = len(parent_indices)
+        chromosome_length = source.shape[1]
+        crossover_points = np.sort(np.random.randint(1, chromosome_length, (number_of_pairs, 2)), axis=1)
+        crossover_points[~crossover_decisions(self.crossover_probability, number_of_pairs)] = chromosome_length # no genes swapped
+        gene_indices = np.arange(chromosome_length)
+        swap_mask = (gene_indices >= crossover_points[:, 0:1]) & (gene_indices < crossover_points[:, 1:2])
+        self.scratch = cross_with_swap_mask(source, parent_indices, destination, swap_mask, self.scratch)
+
+if __name__ == "__main__":
+    a = np.array([[1], [2], [3], [4], [5]])
+    b = np.array([[100], [200], [300], [400], [500]])
+    c = TwoPointCrossover(0.8)
+    new_a, new_b = c.cross((a,b), 1)
+    print new_a
+    print new_b
+    source = np.hstack((a, b)).T
+    destination = np.empty((4, 5), dtype=int)
+    c.cross_batch(source, np.array([[0, 1], [1, 0]]), destination, 1)
+    print destination
@@ -0,0 +1,42 @@
+import numpy as np
+import random
+
+from genetic.crossover.batch import cross_with_swap_mask, crossover_decisions
+
+class UniformCrossover:
+    def __init__(self, crossover_probability, swap_probability=0.5):
+        """
+        :param crossover_probability: typically between 0.7 and 1
+        :param swap_probability: the gene-wise probability that the genes of the two parents are exchanged, given that crossover takes place
+        """
+        self.crossover_probability = crossover_probability
+        self.swap_probability = swap_probability
+        self.scratch = None
+
+    def cross(self, (a,b), generation):
+        if random.random() < self.crossover_probability:
+            swap_mask = np.random.random(a.shape) < self.swap_probability
+            return (
+                np.where(swap_mask, b, a),
+                np.where(swap_mask, a, b)
+            )
+        else:
+            return (np.copy(a),np.copy(b)) # important to return COPIES, not the original
+
+    def cross_batch(self, source, parent_indices, destination, generation):
+        number_of_pairs = len(parent_indices)
+        swap_mask = np.random.random((number_of_pairs, source.shape[1])) < self.swap_probability
+        swap_mask &= crossover_decisions(self.crossover_probability, number_of_pairs)[:, np.newaxis]
+        self.scratch = cross_with_swap_mask(source, parent_indices, destination, swap_mask, self.scratch)
+
+if __name__ == "__main__":
+    a = np.array([[1], [2], [3], [4], [5]])
+    b = np.array([[100], [200], [300], [400], [500]])
+    c = UniformCrossover(0.8)
+    new_a, new_b = c.cross((a,b), 1)
+    print new_a
+    print new_b
+    source = np.hstack((a, b)).T
+    destination = np.empty((4, 5), dtype=int)
+    c.cross_batch(source, np.array([[0, 1], [1, 0]]), destination, 1)
+    print destination
@@ -0,0 +1,67 @@
+class CurriculumScheduler:
+    """
+    Steps through a list of increasingly demanding (and expensive) stages, such as simulation settings with longer
+    levels and more enemies, advancing to the next stage when the best fitness has not improved by more than
+    min_improvement for patience generations, or when the current stage has lasted max_generations_per_stage generations.
+
+    The fitness function reads current_stage, and GeneticAlgorithm calls update after each generation
+    and records stage_index in the PopulationData, so that a run can be resumed in the right stage.
+    Since the fitness scores of different stages are not comparable, the plateau detection starts over in each stage.
+    """
+    def __init__(self, stages, patience=10, min_improvement=0.0, max_generations_per_stage=None):
+        """
+        :param stages: a list of stages of any kind
+        :param patience: the number of generations without improvement after which the next stage is started
+        :param min_improvement: the increase of the best fitness that counts as an improvement
+        :param max_generations_per_stage: the maximum number of generations of each stage, or None for no limit
+        """
+        self.stages = stages
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.max_generations_per_stage = max_generations_per_stage
+        self.stage_index = 0
+        self.best_fitness = None # in the current stage
+        self.generations_without_improvement = 0
+        self.generations_in_stage = 0
+        self.history = [] # pairs of (generation, stage_index) for each advancement
+
+    @property
+    def current_stage(self):
+        return self.stages[self.stage_index]
+
+    def resume(self, stage_index):
+        """
+        Continues in the specified stage (if not None), for instance the one recorded in saved population data
+        """
+        if stage_index is not None:
+            self.stage_index = min(stage_index, len(self.stages) - 1)
+            self.best_fitness = None
+            self.generations_without_improvement = 0
+            self.generations_in_stage = 0
+
+    def update(self, generation, best_fitness):
+        """
+        Called after each generation
+        :return: True if the next stage is started
+        """
+        if self.stage_index == len(self.stages) - 1:
+            return False
+        self.generations_in_stage += 1
+        if self.best_fitness is None or best_fitness > self.best_fitness + self.min_improvement:
+            self.best_fitness = best_fitness
+            self.generations_without_improvement = 0
+        else:
+            self.generations_without_improvement += 1
+        if self.generations_without_improvement >= self.patience or \
+                (self.max_generations_per_stage is not None and self.generations_in_stage >= self.max_generations_per_stage):
+            self.resume(self.stage_index + 1)
+            self.history.append((generation, self.stage_index))
+            return True
+        return False
+
+
+if __name__ == "__main__":
+    c = CurriculumScheduler(["short", "medium", "long"], patience=3)
+    for generation, best_fitness in enumerate([1, 2, 2, 2, 2, 5, 6, 6, 6, 6, 6], 1):
+        c.update(generation, best_fitness)
+        print generation, best_fitness, c.current_stage
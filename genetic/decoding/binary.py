@@ -2,11 +2,13 @@ import numpy as np
 import numbers
 
 class BinaryDecoding:
-    def __init__(self, variable_range, number_of_variables, bits_per_variable):
+    def __init__(self, variable_range, number_of_variables, bits_per_variable, dtype=np.float64, packed=False):
         """
         :param variable_range: a tuple of (min, max) or a single number r resulting in (-r, r)
         :param number_of_variables: number of variables encoded in the chromosome
         :param bits_per_variable: number of bits used to store one variable
+        :param dtype: the data type of the decoded variables, for instance np.float32 to produce network weights directly
+        :param packed: if the chromosomes are bit-packed (see genetic.packing)
         """
         if isinstance(variable_range, numbers.Number):
             self.variable_range = (-variable_range, variable_range)
@@ -15,18 +17,68 @@ class BinaryDecoding:
         self.range_width = self.variable_range[1] - self.variable_range[0]
         self.number_of_variables = number_of_variables
         self.bits_per_variable = bits_per_variable
+        self.dtype = dtype
+        self.packed = packed
+
+        # Tables computed once instead of at every decoding
+        self.number_of_bits = number_of_variables * bits_per_variable
+        self.genes_per_variable = bits_per_variable
+        self.step = self.range_width / (2.0**bits_per_variable - 1) # the change in value of the least significant bit
+        if bits_per_variable <= 62:
+            self.powers_of_two = 2 ** np.arange(bits_per_variable-1, -1, -1, dtype=np.int64)
+        else:
+            self.powers_of_two = 2.0 ** np.arange(bits_per_variable-1, -1, -1)
+        if bits_per_variable <= 56:
+            # for bit-packed chromosomes, the 8 bytes starting with the first byte of each variable are read as one
+            # big-endian 64 bit integer, which is shifted to leave only the bits of the variable
+            first_bits = np.arange(number_of_variables) * bits_per_variable
+            self.byte_indices = first_bits[:, np.newaxis] // 8 + np.arange(8)
+            self.left_shifts = (first_bits % 8).astype(np.uint64)
+            self.right_shift = np.uint64(64 - bits_per_variable)
+        else:
+            self.byte_indices = None
 
     def decode(self, chromosome):
-        max_raw_value = 1 - 2.0**(-self.bits_per_variable)
-        negative_powers_of_two = 2.0 ** -np.arange(1,self.bits_per_variable+1).reshape(-1,1)
-        reshaped_chromosome = chromosome.reshape((self.number_of_variables, self.bits_per_variable))
-        raw_values = np.dot(reshaped_chromosome, negative_powers_of_two)
-        normalized_values = raw_values / max_raw_value
-        rescaled_values = self.variable_range[0] + normalized_values * self.range_width
-        return rescaled_values
+        return self.decode_batch(chromosome.reshape(1, -1)).reshape(-1, 1)
+
+    def decode_batch(self, population):
+        """
+        :param population: a population matrix, bit-packed or not, with one chromosome per row
+        :return: a matrix with the decoded variables of one individual per row
+        """
+        if self.packed and self.byte_indices is not None:
+            # (bytes past the end of the chromosome are clipped to the last byte, but are shifted out anyway)
+            words = np.take(population, self.byte_indices, axis=1, mode='clip').view('>u8')[:, :, 0].astype(np.uint64)
+            raw_values = (words << self.left_shifts) >> self.right_shift
+        else:
+            if self.packed:
+                population = np.unpackbits(population, axis=1)[:, :self.number_of_bits]
+            bits = population.reshape((len(population), self.number_of_variables, self.bits_per_variable))
+            raw_values = np.dot(bits, self.powers_of_two)
+        return self.rescale(raw_values)
+
+    def decode_variables(self, chromosome, variable_indices):
+        """
+        Returns the values of the variables with the specified indices of one chromosome (used for incremental decoding)
+        """
+        genes = np.ravel(chromosome)
+        if self.packed and self.byte_indices is not None:
+            words = np.take(genes, self.byte_indices[variable_indices], mode='clip').view('>u8')[:, 0].astype(np.uint64)
+            raw_values = (words << self.left_shifts[variable_indices]) >> self.right_shift
+        else:
+            if self.packed:
+                genes = np.unpackbits(genes)[:self.number_of_bits]
+            bits = genes.reshape((self.number_of_variables, self.bits_per_variable))[variable_indices]
+            raw_values = np.dot(bits, self.powers_of_two)
+        return self.rescale(raw_values)
+
+    def rescale(self, raw_values):
+        rescaled_values = self.variable_range[0] + raw_values * self.step
+        return rescaled_values.astype(self.dtype, copy=False)
 
 
 if __name__ == "__main__":
     import numpy as np
     d = BinaryDecoding(3, 2, 3)
-    print d.decode(np.array([[1],[0],[1],[1],[1],[0]])) # -> [1.29, 2.14]
\ No newline at end of file
+    print d.decode(np.array([[1],[0],[1],[1],[1],[0]])) # -> [1.29, 2.14]
+    print d.decode_batch(np.array([[1, 0, 1, 1, 1, 0], [0, 0, 0, 1, 1, 1]]))
@@ -0,0 +1,133 @@
+import numpy as np
+
+class ChangeLog:
+    """
+    Record of how each chromosome of a new generation was formed from the chromosomes of the previous generation,
+    as reported by the crossover, mutation and elitism algorithms that have a change_log attribute.
+
+    For each new chromosome it holds its origin, a list of segments (parent_index, start, stop) telling which parent
+    each range of genes was copied from (stop=None meaning the end of the chromosome), or None if unknown,
+    and a list of arrays with the positions of the genes that have been changed after that.
+
+    The per-chromosome operators report changes to the chromosome(s) that the algorithm is currently working on,
+    given by current_pair = (first_child_index, second_child_index, first_parent_index, second_parent_index)
+    and current_index, while the batch operators report changes by population row.
+    """
+    def __init__(self):
+        self.origins = []
+        self.changed_genes = []
+        self.best_individual_index = None
+        self.current_pair = None
+        self.current_index = None
+
+    def start_generation(self, population_size, best_individual_index):
+        self.origins = [None] * population_size
+        self.changed_genes = [[] for _ in range(population_size)]
+        self.best_individual_index = best_individual_index
+
+    def forget(self):
+        """
+        Marks the origins of all chromosomes as unknown, for instance after an operator that does not report its changes
+        """
+        self.origins = [None] * len(self.origins)
+
+    # Reported by crossover algorithms
+
+    def crossed(self, first_child, second_child, first_parent, second_parent, crossover_point):
+        """
+        :param crossover_point: the gene from which the children's genes were exchanged, or None if the children are copies
+        """
+        if crossover_point is None:
+            self.origins[first_child] = [(first_parent, 0, None)]
+            self.origins[second_child] = [(second_parent, 0, None)]
+        else:
+            self.origins[first_child] = [(first_parent, 0, crossover_point), (second_parent, crossover_point, None)]
+            self.origins[second_child] = [(second_parent, 0, crossover_point), (first_parent, crossover_point, None)]
+
+    def crossed_current_pair(self, crossover_point):
+        first_child, second_child, first_parent, second_parent = self.current_pair
+        self.crossed(first_child, second_child, first_parent, second_parent, crossover_point)
+
+    def crossed_batch(self, parent_indices, crossover_points, chromosome_length):
+        """
+        :param crossover_points: one crossover point per pair, where chromosome_length means that no crossover took place
+        """
+        number_of_pairs = len(parent_indices)
+        for k, ((first_parent, second_parent), crossover_point) in enumerate(zip(parent_indices, crossover_points)):
+            self.crossed(k, k + number_of_pairs, first_parent, second_parent,
+                         crossover_point if crossover_point < chromosome_length else None)
+
+    # Reported by mutation algorithms
+
+    def mutated(self, index, genes):
+        if len(genes):
+            self.changed_genes[index].append(np.asarray(genes))
+
+    def mutated_current(self, genes):
+        self.mutated(self.current_index, genes)
+
+    def mutated_batch(self, flat_genes, chromosome_length):
+        """
+        :param flat_genes: sorted positions of the changed genes in the flattened population matrix
+        """
+        indices, genes = np.divmod(flat_genes, chromosome_length)
+        boundaries = np.searchsorted(indices, np.arange(1, len(self.origins)))
+        for index, chromosome_genes in enumerate(np.split(genes, boundaries)):
+            self.mutated(index, chromosome_genes)
+
+    # Reported by elitism algorithms
+
+    def replaced_by_best(self, index):
+        self.origins[index] = [(self.best_individual_index, 0, None)]
+        self.changed_genes[index] = []
+
+
+class IncrementalDecoding:
+    """
+    Decodes a new generation using the decoded variables of the previous generation and a ChangeLog,
+    only decoding the variables that may differ from those of the parent they were copied from,
+    i.e. variables containing mutated genes or split by a crossover point.
+
+    The decoding algorithm must have an attribute genes_per_variable
+    and a function decode_variables(chromosome, variable_indices) returning the values of the specified variables.
+    """
+    def __init__(self, decoding_algorithm):
+        if not hasattr(decoding_algorithm, "decode_variables"):
+            raise ValueError('The decoding algorithm does not support incremental decoding!')
+        self.decoding_algorithm = decoding_algorithm
+        self.genes_per_variable = decoding_algorithm.genes_per_variable
+        self.number_of_decoded_variables = 0 # in the last decoded population
+
+    def decode_population(self, population, change_log, previous_decoded_variables):
+        """
+        :param population: a list of chromosomes or a population matrix
+        :param previous_decoded_variables: a matrix with the decoded variables of the previous generation, one individual per row
+        :return: a matrix with the decoded variables of the new generation
+        """
+        number_of_variables = previous_decoded_variables.shape[1]
+        all_variables = np.arange(number_of_variables)
+        decoded_variables = np.empty_like(previous_decoded_variables)
+        self.number_of_decoded_variables = 0
+        for i, chromosome in enumerate(population):
+            origin = change_log.origins[i]
+            if origin is None:
+                decoded_variables[i] = self.decoding_algorithm.decode_variables(chromosome, all_variables)
+                self.number_of_decoded_variables += number_of_variables
+                continue
+            to_decode = np.zeros(number_of_variables, dtype=bool)
+            for parent_index, start, stop in origin:
+                first_variable = -(-start // self.genes_per_variable) # the first variable entirely within the segment
+                if stop is None:
+                    end_variable = number_of_variables
+                else:
+                    end_variable = stop // self.genes_per_variable
+                    if stop % self.genes_per_variable:
+                        to_decode[end_variable] = True
+                decoded_variables[i, first_variable:end_variable] = previous_decoded_variables[parent_index, first_variable:end_variable]
+            for genes in change_log.changed_genes[i]:
+                to_decode[genes // self.genes_per_variable] = True
+            variable_indices = np.flatnonzero(to_decode)
+            if len(variable_indices):
+                decoded_variables[i, variable_indices] = self.decoding_algorithm.decode_variables(chromosome, variable_indices)
+                self.number_of_decoded_variables += len(variable_indices)
+        return decoded_variables
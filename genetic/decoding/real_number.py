@@ -1,4 +1,5 @@
 import numbers
+import numpy as np
 
 class RealNumberDecoding:
     def __init__(self, variable_range):
@@ -10,14 +11,30 @@ class RealNumberDecoding:
         else:
             self.variable_range = variable_range
         self.range_width = self.variable_range[1] - self.variable_range[0]
+        self.genes_per_variable = 1
 
     def decode(self, chromosome):
         return self.variable_range[0] + chromosome*self.range_width
 
+    def decode_batch(self, population):
+        return self.decode(population)
+
+    def decode_variables(self, chromosome, variable_indices):
+        """
+        Returns the values of the variables with the specified indices (used for incremental decoding)
+        """
+        return self.decode(np.ravel(chromosome)[variable_indices])
+
+    def encode(self, variables):
+        """
+        Returns the genes that decode to the specified variable values (clipped to the variable range), for instance
+        to convert individuals of another encoding
+        """
+        return np.clip((variables - self.variable_range[0]) / float(self.range_width), 0, 1)
+
 
 
 
 if __name__ == "__main__":
-    import numpy as np
     d = RealNumberDecoding((3,5))
     print d.decode(np.array([[1],[0.5],[0]]))
\ No newline at end of file
@@ -1,16 +1,35 @@
+import numpy as np
+
 class Elitism:
     def __init__(self, num_copies):
         """
         :param num_copies: typically one or a few
         """
         self.num_copies = num_copies
+        self.change_log = None
 
     def elitism(self, population, best_individual, generation):
         for i in range(self.num_copies):
             population[i] = best_individual
+        self.report_changes()
+
+    def elitism_batch(self, population, best_individual, generation):
+        population[:self.num_copies] = np.ravel(best_individual)
+        self.report_changes()
+
+    def elitism_runs(self, populations, best_individuals, generation):
+        """
+        :param populations: an array of shape (runs, population size, chromosome length) (see MultiRunGeneticAlgorithm)
+        :param best_individuals: a matrix with the best individual of one run per row
+        """
+        populations[:, :self.num_copies] = best_individuals[:, np.newaxis]
+
+    def report_changes(self):
+        if self.change_log is not None:
+            for i in range(self.num_copies):
+                self.change_log.replaced_by_best(i)
 
 if __name__ == "__main__":
-    import numpy as np
     e = Elitism(1)
     x = [np.array([[0]]), np.array([[2]]), np.array([[6]]), np.array([[5]])]
 
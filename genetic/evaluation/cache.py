@@ -0,0 +1,98 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+GLOBAL_SCOPE = 'global'
+GENERATION_SCOPE = 'generation'
+
+class FitnessCache:
+    """
+    Remembers the fitness scores of already evaluated chromosomes, keyed by a hash of the genes,
+    so that chromosomes carried over by elitism or copied unchanged by crossover are not evaluated again.
+
+    With GLOBAL_SCOPE, the scores are kept between generations, which is only correct for deterministic fitness functions.
+    With GENERATION_SCOPE, the cache is cleared at the start of every generation, which is needed for fitness functions
+    such as CopterFitnessFunction that change the scenario each generation, and then only removes duplicates within a generation.
+    """
+    def __init__(self, max_size=1000, scope=GLOBAL_SCOPE):
+        """
+        :param max_size: the maximum number of fitness scores kept, after which the least recently used ones are evicted
+        :param scope: GLOBAL_SCOPE or GENERATION_SCOPE
+        """
+        if scope not in (GLOBAL_SCOPE, GENERATION_SCOPE):
+            raise ValueError('The scope must be either GLOBAL_SCOPE or GENERATION_SCOPE!')
+        self.max_size = max_size
+        self.scope = scope
+        self.entries = OrderedDict()
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, chromosome):
+        chromosome = np.ascontiguousarray(chromosome)
+        return hashlib.sha1(chromosome).digest() + str(chromosome.dtype) + str(chromosome.size)
+
+    def start_generation(self, generation):
+        if self.scope == GENERATION_SCOPE and generation != self.generation:
+            self.entries.clear()
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        :return: the cached fitness score, or None if the key is not in the cache
+        """
+        fitness = self.entries.pop(key, None)
+        if fitness is not None:
+            self.entries[key] = fitness # most recently used last
+        return fitness
+
+    def store(self, key, fitness):
+        self.entries.pop(key, None)
+        self.entries[key] = fitness
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def evaluate_population(self, population, evaluate_individuals, generation, is_complete=None):
+        """
+        Returns the fitness scores of the population, evaluating each distinct chromosome that is not already cached once
+        :param population: a list of chromosomes or a population matrix
+        :param evaluate_individuals: function taking a list of population indices and returning their fitness scores
+        :param is_complete: an optional function is_complete(fitness) returning False for results that must not be kept for later generations, such as partial racing scores or surrogate predictions
+        """
+        self.start_generation(generation)
+        fitness_scores = [None] * len(population)
+        first_index_of_key = {}
+        duplicates = []
+        for i, chromosome in enumerate(population):
+            key = self.key(chromosome)
+            if key in first_index_of_key:
+                duplicates.append((i, first_index_of_key[key]))
+                continue
+            fitness = self.lookup(key)
+            if fitness is not None:
+                fitness_scores[i] = fitness
+                self.hits += 1
+            else:
+                first_index_of_key[key] = i
+        indices = sorted(first_index_of_key.values())
+        if indices:
+            index_to_key = dict((i, key) for key, i in first_index_of_key.iteritems())
+            for i, fitness in zip(indices, evaluate_individuals(indices)):
+                fitness_scores[i] = fitness
+                if is_complete is None or is_complete(fitness):
+                    self.store(index_to_key[i], fitness)
+        for i, original in duplicates:
+            fitness_scores[i] = fitness_scores[original]
+        self.hits += len(duplicates)
+        self.misses += len(indices)
+        return fitness_scores
+
+
+if __name__ == "__main__":
+    c = FitnessCache(10)
+    population = [np.array([[1], [0]]), np.array([[1], [1]]), np.array([[1], [0]])]
+    print c.evaluate_population(population, lambda indices: [float(i) for i in indices], 1), c.hits, c.misses
+    print c.evaluate_population(population, lambda indices: [float(i) for i in indices], 2), c.hits, c.misses
@@ -0,0 +1,145 @@
+import random
+import time
+import numpy as np
+
+def average_ranks(values):
+    """
+    :return: the ranks of the values (from 0), where tied values get the average of their ranks
+    """
+    values = np.ravel(values)
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind='mergesort')] = np.arange(len(values))
+    _, inverse = np.unique(values, return_inverse=True)
+    return (np.bincount(inverse, ranks) / np.bincount(inverse))[inverse]
+
+def rank_correlation(a, b):
+    """
+    :return: Spearman's rank correlation coefficient between two sequences, or nan if either of them is constant
+    """
+    ranks_a, ranks_b = average_ranks(a), average_ranks(b)
+    if len(ranks_a) < 2 or np.all(ranks_a == ranks_a[0]) or np.all(ranks_b == ranks_b[0]):
+        return float('nan')
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+def evaluate_rows(fitness_function, decoded_variables, generation):
+    if hasattr(fitness_function, "evaluate_batch"):
+        return np.ravel(fitness_function.evaluate_batch(decoded_variables, generation)).astype(float)
+    evaluate = getattr(fitness_function, "evaluate", fitness_function)
+    return np.array([evaluate(variables[:, np.newaxis], generation) for variables in decoded_variables], dtype=float)
+
+
+class CalibrationRecord:
+    """
+    How well the low-fidelity scores of one generation predicted the high-fidelity scores
+    """
+    def __init__(self, generation, number_of_pairs, rank_correlation, slope, intercept, low_fidelity_time, high_fidelity_time):
+        self.generation = generation
+        self.number_of_pairs = number_of_pairs
+        self.rank_correlation = rank_correlation
+        self.slope = slope
+        self.intercept = intercept
+        self.low_fidelity_time = low_fidelity_time # seconds per individual
+        self.high_fidelity_time = high_fidelity_time
+
+    def __str__(self):
+        speedup = self.high_fidelity_time / self.low_fidelity_time if self.low_fidelity_time > 0 else float('inf')
+        return "generation " + str(self.generation) + ": rank correlation " + "%.3f" % self.rank_correlation + \
+               " over " + str(self.number_of_pairs) + " individuals, estimate = " + "%.4g" % self.slope + " * low + " + \
+               "%.4g" % self.intercept + ", low fidelity " + "%.1f" % speedup + " times faster"
+
+
+class MultiFidelityFitnessFunction:
+    """
+    Screens the individuals of a generation with a cheap low-fidelity fitness function, and evaluates only the best
+    number_of_full_evaluations of them, and number_of_exploration_evaluations randomly chosen others,
+    with the high-fidelity fitness function.
+
+    The other individuals get an estimate from a linear calibration of the high-fidelity scores on the low-fidelity
+    scores of the individuals evaluated with both in the same generation, capped just below the lowest
+    high-fidelity score of the screened top, so that the best individual is always one evaluated with high fidelity.
+    The estimated scores are marked with evaluated_fractions 0.0 (see PopulationData).
+
+    Each generation a CalibrationRecord is added to calibration_history, with the rank correlation between the
+    fidelities and the time per individual of each, which shows whether the screening is safe.
+    """
+    def __init__(self, low_fidelity_fitness_function, high_fidelity_fitness_function, number_of_full_evaluations, number_of_exploration_evaluations=0):
+        """
+        :param low_fidelity_fitness_function: function, or object with function, evaluate(variables, generation) or evaluate_batch(decoded_variables, generation)
+        :param high_fidelity_fitness_function: function, or object with function, evaluate(variables, generation) or evaluate_batch(decoded_variables, generation)
+        :param number_of_full_evaluations: the number of individuals with the best low-fidelity scores that are evaluated with high fidelity (at least 1)
+        :param number_of_exploration_evaluations: the number of randomly chosen other individuals that are evaluated with high fidelity
+        """
+        if number_of_full_evaluations < 1:
+            raise ValueError('At least one individual per generation must be evaluated with high fidelity!')
+        self.low_fidelity_fitness_function = low_fidelity_fitness_function
+        self.high_fidelity_fitness_function = high_fidelity_fitness_function
+        self.number_of_full_evaluations = number_of_full_evaluations
+        self.number_of_exploration_evaluations = number_of_exploration_evaluations
+        self.evaluated_fractions = []
+        self.calibration_history = []
+
+    def evaluate(self, variables, generation):
+        return evaluate_rows(self.high_fidelity_fitness_function, np.ravel(variables)[np.newaxis, :], generation)[0]
+
+    def evaluate_batch(self, decoded_variables, generation):
+        number_of_individuals = len(decoded_variables)
+        start_time = time.time()
+        low_fidelity_scores = evaluate_rows(self.low_fidelity_fitness_function, decoded_variables, generation)
+        low_fidelity_time = (time.time() - start_time) / number_of_individuals
+
+        ranking = np.argsort(-low_fidelity_scores, kind='mergesort')
+        top = ranking[:self.number_of_full_evaluations]
+        others = list(ranking[self.number_of_full_evaluations:])
+        exploration = random.sample(others, min(self.number_of_exploration_evaluations, len(others)))
+        fully_evaluated = np.concatenate((top, np.array(exploration, dtype=int)))
+
+        start_time = time.time()
+        high_fidelity_scores = evaluate_rows(self.high_fidelity_fitness_function, decoded_variables[fully_evaluated], generation)
+        high_fidelity_time = (time.time() - start_time) / len(fully_evaluated)
+
+        slope, intercept = self.calibrate(low_fidelity_scores[fully_evaluated], high_fidelity_scores)
+        fitness_scores = slope * low_fidelity_scores + intercept
+        fitness_scores = np.minimum(fitness_scores, np.nextafter(np.min(high_fidelity_scores[:len(top)]), -np.inf))
+        fitness_scores[fully_evaluated] = high_fidelity_scores
+
+        self.evaluated_fractions = [0.0] * number_of_individuals
+        high_fidelity_fractions = getattr(self.high_fidelity_fitness_function, "evaluated_fractions", None) or [1.0] * len(fully_evaluated)
+        for i, fraction in zip(fully_evaluated, high_fidelity_fractions):
+            self.evaluated_fractions[i] = fraction
+        self.calibration_history.append(CalibrationRecord(generation, len(fully_evaluated),
+                                                          rank_correlation(low_fidelity_scores[fully_evaluated], high_fidelity_scores),
+                                                          slope, intercept, low_fidelity_time, high_fidelity_time))
+        return list(fitness_scores)
+
+    def calibrate(self, low_fidelity_scores, high_fidelity_scores):
+        """
+        :return: (slope, intercept) of the least squares fit of the high-fidelity scores on the low-fidelity scores, or only an offset if the low-fidelity scores are constant
+        """
+        if len(low_fidelity_scores) < 2 or np.all(low_fidelity_scores == low_fidelity_scores[0]):
+            return 0.0, float(np.mean(high_fidelity_scores))
+        slope, intercept = np.polyfit(low_fidelity_scores, high_fidelity_scores, 1)
+        return float(slope), float(intercept)
+
+    def calibration_report(self, last_n=None):
+        """
+        :return: a text with one line per generation (or for the last_n generations) and the mean rank correlation
+        """
+        records = self.calibration_history[-last_n:] if last_n else self.calibration_history
+        correlations = [record.rank_correlation for record in records if not np.isnan(record.rank_correlation)]
+        lines = [str(record) for record in records]
+        if correlations:
+            lines.append("mean rank correlation: " + "%.3f" % np.mean(correlations))
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    def sphere(variables, generation):
+        return -float(np.sum(variables**2))
+
+    def noisy_sphere(variables, generation):
+        return sphere(variables, generation) + np.random.normal(0, 0.2)
+
+    m = MultiFidelityFitnessFunction(noisy_sphere, sphere, 5, 2)
+    print m.evaluate_batch(np.random.uniform(-1, 1, (20, 3)), 1)
+    print m.evaluated_fractions
+    print m.calibration_report()
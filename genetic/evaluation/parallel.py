@@ -0,0 +1,104 @@
+import multiprocessing
+import traceback
+import numpy as np
+
+from genetic.population import column_views
+
+_worker_fitness_function = None
+
+def _initialize_worker(fitness_function, worker_initializer):
+    global _worker_fitness_function
+    if worker_initializer is not None:
+        worker_initializer()
+    _worker_fitness_function = fitness_function
+
+def _evaluate_chunk((decoded_variables, generation, scenario)):
+    fitness_function = _worker_fitness_function
+    if scenario is not None:
+        fitness_function.use_scenario(scenario, generation)
+    evaluate = getattr(fitness_function, "evaluate", fitness_function)
+    return [evaluate(variables, generation) for variables in column_views(decoded_variables)]
+
+def _evaluate_one((variables, generation, scenario)):
+    """
+    :return: a pair (fitness, None), or (None, traceback) if the evaluation failed, since a failed asynchronous task would otherwise never be reported
+    """
+    try:
+        return _evaluate_chunk((variables[np.newaxis, :], generation, scenario))[0], None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+class ParallelFitnessFunction:
+    """
+    Evaluates the individuals of a generation in a persistent pool of worker processes,
+    through the evaluate_batch function used by GeneticAlgorithm.
+
+    The fitness function may optionally have the functions create_scenario(generation), returning a picklable
+    description of everything random that the evaluations of a generation share (such as the levels to run),
+    and use_scenario(scenario, generation), making the following evaluations use that scenario.
+    The scenario is then created once per generation in this process, when the first individual of the generation
+    is evaluated (by any of evaluate, evaluate_batch and evaluate_async), using the same random state as a serial
+    evaluation would, and sent to the workers together with the decoded variables, so that the results are identical
+    to those of a serial evaluation.
+    """
+    def __init__(self, fitness_function, number_of_processes=None, worker_initializer=None):
+        """
+        :param fitness_function: function, or object with function, evaluate(variables, generation) returning the fitness score. It is copied to each worker when the pool is started.
+        :param number_of_processes: the number of worker processes, or None to use one per core
+        :param worker_initializer: an optional function called once in each worker process when it is started, for instance to build the simulation used by the fitness function
+        """
+        self.fitness_function = fitness_function
+        self.number_of_processes = number_of_processes or multiprocessing.cpu_count()
+        self.worker_initializer = worker_initializer
+        self.pool = None
+        self.scenario_generation = None
+        self.scenario = None
+
+    def start(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.number_of_processes,
+                                             _initialize_worker,
+                                             (self.fitness_function, self.worker_initializer))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def get_scenario(self, generation):
+        """
+        :return: the scenario of the generation (or None if the fitness function has no create_scenario), which is created when it is first needed and then reused by all evaluations of the generation
+        """
+        if hasattr(self.fitness_function, "create_scenario") and generation != self.scenario_generation:
+            self.scenario = self.fitness_function.create_scenario(generation)
+            self.scenario_generation = generation
+        return self.scenario
+
+    def evaluate_batch(self, decoded_variables, generation):
+        self.start()
+        scenario = self.get_scenario(generation)
+        chunks = np.array_split(decoded_variables, min(self.number_of_processes, len(decoded_variables)))
+        results = self.pool.map(_evaluate_chunk, [(chunk, generation, scenario) for chunk in chunks], chunksize=1)
+        return [fitness for chunk_results in results for fitness in chunk_results]
+
+    def evaluate(self, variables, generation):
+        return self.evaluate_batch(np.ravel(variables)[np.newaxis, :], generation)[0]
+
+    def evaluate_async(self, variables, generation, callback):
+        """
+        Starts the evaluation of one individual without waiting for it to finish, for instance in a steady-state algorithm.
+        :param callback: a function callback((fitness, error)), called in a thread of this process when the evaluation is done, where error is None or the traceback of the failed evaluation
+        """
+        self.start()
+        self.pool.apply_async(_evaluate_one, ((np.ravel(variables), generation, self.get_scenario(generation)),), callback=callback)
+
+
+if __name__ == "__main__":
+    def sphere(variables, generation):
+        return -float(np.sum(variables**2))
+
+    p = ParallelFitnessFunction(sphere, 4)
+    print p.evaluate_batch(np.arange(12.0).reshape(6, 2), 1)
+    p.close()
@@ -0,0 +1,93 @@
+import numpy as np
+
+class RacingFitnessFunction:
+    """
+    Evaluates the individuals of a generation stage by stage (for instance level by level), where the fitness score
+    is the average of the stage scores, and stops evaluating the individuals that can no longer reach the top fraction
+    of the population that matters for the selection (racing / successive halving).
+
+    All individuals are evaluated on the first stages, up to the first number in the stage schedule. After that,
+    and after each following number in the schedule, only the individuals whose partial average is at least the partial
+    average of the individual ranked at the top fraction, minus a margin, continue with the following stages.
+    The fitness scores of the eliminated individuals are their partial averages, and evaluated_fractions tells
+    which scores are partial (GeneticAlgorithm stores these in the PopulationData).
+
+    The wrapped fitness function must have an attribute number_of_stages and a function
+    evaluate_stage(variables, stage, generation) returning a pair (score, cost), where cost is, for instance,
+    the number of simulation timesteps used. The cost of the stages that were skipped is estimated
+    from the average cost per evaluated stage, and both costs are returned by evaluation_costs (GeneticAlgorithm
+    stores them in the PopulationData).
+    """
+    def __init__(self, fitness_function, stage_schedule, top_fraction=0.25, margin=0.0):
+        """
+        :param fitness_function: an object with an attribute number_of_stages and a function evaluate_stage(variables, stage, generation)
+        :param stage_schedule: the increasing numbers of evaluated stages after which individuals may be eliminated, for instance (2, 4)
+        :param top_fraction: the fraction of the individuals (in each evaluated batch) whose fitness scores are relevant for the selection
+        :param margin: how far below the partial average of the last individual in the top fraction an individual may be and still continue
+        """
+        self.fitness_function = fitness_function
+        self.stage_schedule = stage_schedule
+        self.top_fraction = top_fraction
+        self.margin = margin
+        self.evaluated_fractions = [] # for the individuals of the last evaluated batch, 1.0 meaning all stages
+        self.generation = None
+        self.cost = 0 # in the current generation
+        self.saved_cost = 0 # (estimated) in the current generation
+
+    def evaluate(self, variables, generation):
+        number_of_stages = self.fitness_function.number_of_stages
+        return sum(self.fitness_function.evaluate_stage(variables, stage, generation)[0] for stage in range(number_of_stages)) / float(number_of_stages)
+
+    def evaluate_batch(self, decoded_variables, generation):
+        """
+        :param decoded_variables: a matrix with the variable values of one individual per row
+        :return: a list of fitness scores, which are partial averages for the eliminated individuals
+        """
+        if generation != self.generation:
+            self.generation = generation
+            self.cost = 0
+            self.saved_cost = 0
+        number_of_individuals = len(decoded_variables)
+        number_of_stages = self.fitness_function.number_of_stages
+        number_of_top_individuals = max(1, int(np.ceil(self.top_fraction * number_of_individuals)))
+        totals = np.zeros(number_of_individuals)
+        evaluated_stages = np.zeros(number_of_individuals, dtype=int)
+        running = np.arange(number_of_individuals)
+        cost = 0
+        for checkpoint in [c for c in self.stage_schedule if c < number_of_stages] + [number_of_stages]:
+            for i in running:
+                variables = decoded_variables[i][:, np.newaxis]
+                for stage in range(evaluated_stages[i], checkpoint):
+                    score, stage_cost = self.fitness_function.evaluate_stage(variables, stage, generation)
+                    totals[i] += score
+                    cost += stage_cost
+                evaluated_stages[i] = checkpoint
+            if checkpoint < number_of_stages and len(running) > number_of_top_individuals:
+                partial_averages = totals[running] / checkpoint
+                threshold = np.sort(partial_averages)[-number_of_top_individuals] - self.margin
+                running = running[partial_averages >= threshold]
+        number_of_evaluated_stages = np.sum(evaluated_stages)
+        self.evaluated_fractions = list(evaluated_stages / float(number_of_stages))
+        self.cost += cost
+        self.saved_cost += int(round(cost / float(number_of_evaluated_stages) * (number_of_individuals * number_of_stages - number_of_evaluated_stages)))
+        return list(totals / evaluated_stages)
+
+    def evaluation_costs(self, generation):
+        """
+        :return: the cost and the (estimated) saved cost of the evaluations in the generation, which are zero if no individuals were evaluated in it (for instance if all fitness scores were cached)
+        """
+        if generation != self.generation:
+            return 0, 0
+        return self.cost, self.saved_cost
+
+
+if __name__ == "__main__":
+    class NoisySphere:
+        number_of_stages = 7
+
+        def evaluate_stage(self, variables, stage, generation):
+            return -float(np.sum(variables**2)) + np.random.normal(0, 0.1), 100
+
+    r = RacingFitnessFunction(NoisySphere(), (2, 4), 0.25)
+    print r.evaluate_batch(np.linspace(-1, 1, 20).reshape(10, 2), 1)
+    print r.evaluated_fractions, r.evaluation_costs(1)
@@ -0,0 +1,185 @@
+import random
+import numpy as np
+
+from genetic.evaluation.multi_fidelity import rank_correlation
+from genetic.population import population_matrix_from_list
+
+class RidgeSurrogate:
+    """
+    Online ridge regression of the fitness on the decoded variables, trained incrementally by accumulating
+    the normal equations, so that the cost of training does not grow with the number of samples seen
+    (but the memory and the cost of prediction grow with the square of the number of variables)
+    """
+    def __init__(self, regularization=1.0):
+        self.regularization = regularization
+        self.gram_matrix = None # X^T X, with a column of ones for the intercept
+        self.moments = None # X^T y
+        self.number_of_samples = 0
+        self.weights = None
+
+    def train(self, decoded_variables, fitness_scores):
+        x = np.hstack((decoded_variables, np.ones((len(decoded_variables), 1))))
+        if self.gram_matrix is None:
+            self.gram_matrix = np.zeros((x.shape[1], x.shape[1]))
+            self.moments = np.zeros(x.shape[1])
+        self.gram_matrix += np.dot(x.T, x)
+        self.moments += np.dot(x.T, fitness_scores)
+        self.number_of_samples += len(x)
+        self.weights = None
+
+    def predict(self, decoded_variables):
+        if self.weights is None:
+            regularization = self.regularization * np.eye(len(self.gram_matrix))
+            regularization[-1, -1] = 0 # (the intercept is not regularized)
+            self.weights = np.linalg.solve(self.gram_matrix + regularization, self.moments)
+        return np.dot(decoded_variables, self.weights[:-1]) + self.weights[-1]
+
+
+class NearestNeighbourSurrogate:
+    """
+    Predicts the fitness as the mean fitness of the k nearest (in Euclidean distance) of the last max_size samples
+    """
+    def __init__(self, k=5, max_size=2000):
+        self.k = k
+        self.max_size = max_size
+        self.samples = None
+        self.fitness_scores = None
+        self.number_of_samples = 0
+
+    def train(self, decoded_variables, fitness_scores):
+        if self.samples is None:
+            self.samples = np.zeros((self.max_size, decoded_variables.shape[1]))
+            self.fitness_scores = np.zeros(self.max_size)
+        positions = np.arange(self.number_of_samples, self.number_of_samples + len(decoded_variables)) % self.max_size
+        self.samples[positions] = decoded_variables
+        self.fitness_scores[positions] = fitness_scores
+        self.number_of_samples += len(decoded_variables)
+
+    def predict(self, decoded_variables):
+        size = min(self.number_of_samples, self.max_size)
+        samples = self.samples[:size]
+        squared_distances = np.sum(decoded_variables**2, axis=1)[:, np.newaxis] - 2 * np.dot(decoded_variables, samples.T) + np.sum(samples**2, axis=1)
+        k = min(self.k, size)
+        nearest = np.argpartition(squared_distances, k - 1, axis=1)[:, :k]
+        return np.mean(self.fitness_scores[:size][nearest], axis=1)
+
+
+class SurrogateRecord:
+    """
+    How well the surrogate predicted the fitness scores of the individuals that were truly evaluated in one generation
+    """
+    def __init__(self, generation, number_of_evaluations, number_of_estimates, mean_absolute_error, root_mean_square_error, rank_correlation, false_skip_rate):
+        self.generation = generation
+        self.number_of_evaluations = number_of_evaluations
+        self.number_of_estimates = number_of_estimates
+        self.mean_absolute_error = mean_absolute_error
+        self.root_mean_square_error = root_mean_square_error
+        self.rank_correlation = rank_correlation
+        self.false_skip_rate = false_skip_rate # among the individuals that would have been skipped but were evaluated anyway
+
+    def __str__(self):
+        return "generation " + str(self.generation) + ": " + str(self.number_of_estimates) + " estimated, " + \
+               str(self.number_of_evaluations) + " evaluated, mean absolute error " + "%.4g" % self.mean_absolute_error + \
+               ", rank correlation " + "%.3f" % self.rank_correlation + ", false skip rate " + "%.3f" % self.false_skip_rate
+
+
+class SurrogateFilter:
+    """
+    Skips the evaluation of the individuals that a surrogate model, such as a RidgeSurrogate or a NearestNeighbourSurrogate,
+    confidently predicts to be below the threshold_quantile of the fitness scores of the previous generation,
+    i.e. whose prediction plus confidence times the root mean square error of the previous generation's predictions
+    is below it. These individuals get the predicted fitness instead, marked with evaluated_fractions 0.0
+    (see PopulationData), except for a random evaluated_fraction of them, which are evaluated anyway
+    so that the error of the model is measured where it matters.
+
+    The model is trained incrementally on all truly evaluated individuals, and can be trained on saved population data
+    with train_on_population_data. Each generation with predictions adds a SurrogateRecord to history.
+    """
+    def __init__(self, model, threshold_quantile=0.5, evaluated_fraction=0.2, confidence=1.0, min_training_size=100):
+        """
+        :param model: an object with functions train(decoded_variables, fitness_scores) and predict(decoded_variables), taking matrices with the variable values of one individual per row
+        :param threshold_quantile: the quantile of the previous generation's fitness scores below which individuals may be skipped
+        :param evaluated_fraction: the fraction of the individuals that would be skipped that are evaluated anyway
+        :param confidence: the number of root mean square errors that a prediction must be below the threshold for the individual to be skipped
+        :param min_training_size: the number of samples the model is trained on before it is used
+        """
+        self.model = model
+        self.threshold_quantile = threshold_quantile
+        self.evaluated_fraction = evaluated_fraction
+        self.confidence = confidence
+        self.min_training_size = min_training_size
+        self.threshold = None
+        self.root_mean_square_error = None
+        self.history = []
+
+    def train_on_population_data(self, population_data):
+        """
+        Trains the model on the decoded variables and fitness scores of a PopulationData (PrunedPopulationData is ignored)
+        """
+        decoded_variable_vectors = getattr(population_data, "decoded_variable_vectors", None)
+        if decoded_variable_vectors is not None:
+            self.model.train(population_matrix_from_list(decoded_variable_vectors), np.array(population_data.fitness_scores, dtype=float))
+
+    def prefilter(self, evaluate_individuals, decoded_variables, generation):
+        """
+        :param evaluate_individuals: function taking a list of population indices (or None for all) and returning pairs of (fitness, evaluated fraction)
+        :param decoded_variables: a matrix with the variable values of the whole population, one individual per row
+        :return: a function like evaluate_individuals, which only evaluates the individuals that are not skipped
+        """
+        def evaluate_with_surrogate(indices):
+            if indices is None:
+                indices = range(len(decoded_variables))
+            variables = decoded_variables[indices]
+            if self.model.number_of_samples < self.min_training_size or self.threshold is None:
+                results = evaluate_individuals(indices)
+                self.learn(variables, results, results)
+                return results
+
+            predictions = self.model.predict(variables)
+            margin = self.confidence * (self.root_mean_square_error if self.root_mean_square_error is not None else np.inf)
+            predicted_below = predictions + margin < self.threshold
+            skipped = predicted_below & (np.random.random(len(indices)) >= self.evaluated_fraction)
+            evaluated = np.flatnonzero(~skipped)
+            evaluated_results = evaluate_individuals([indices[i] for i in evaluated]) if len(evaluated) else []
+            results = [(prediction, 0.0) for prediction in predictions]
+            for i, result in zip(evaluated, evaluated_results):
+                results[i] = result
+
+            true_fitness = np.array([fitness for fitness, _ in evaluated_results], dtype=float)
+            errors = predictions[evaluated] - true_fitness
+            false_skips = [fitness >= self.threshold for i, (fitness, _) in zip(evaluated, evaluated_results) if predicted_below[i]]
+            self.history.append(SurrogateRecord(generation, len(evaluated), int(np.sum(skipped)),
+                                                float(np.mean(np.abs(errors))) if len(errors) else float('nan'),
+                                                float(np.sqrt(np.mean(errors**2))) if len(errors) else float('nan'),
+                                                rank_correlation(predictions[evaluated], true_fitness),
+                                                float(np.mean(false_skips)) if false_skips else float('nan')))
+            if len(errors):
+                self.root_mean_square_error = self.history[-1].root_mean_square_error
+            self.learn(variables[evaluated], evaluated_results, results)
+            return results
+        return evaluate_with_surrogate
+
+    def learn(self, variables, evaluated_results, all_results):
+        if len(evaluated_results):
+            self.model.train(variables, np.array([fitness for fitness, _ in evaluated_results], dtype=float))
+        self.threshold = np.percentile([fitness for fitness, _ in all_results], 100 * self.threshold_quantile)
+
+    def report(self, last_n=None):
+        """
+        :return: a text with one line per generation (or for the last_n generations)
+        """
+        records = self.history[-last_n:] if last_n else self.history
+        return "\n".join(str(record) for record in records)
+
+
+if __name__ == "__main__":
+    def sphere(variables):
+        return -np.sum(variables**2, axis=1)
+
+    for model in (RidgeSurrogate(), NearestNeighbourSurrogate()):
+        f = SurrogateFilter(model, min_training_size=50)
+        for generation in range(1, 6):
+            x = np.random.uniform(-1, 1, (40, 3))
+            evaluate = lambda indices: [(fitness, 1.0) for fitness in sphere(x[indices])]
+            f.prefilter(evaluate, x, generation)(None)
+        print f.report()
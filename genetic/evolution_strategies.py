@@ -0,0 +1,234 @@
+import multiprocessing
+import numpy as np
+
+from genetic.evaluation.multi_fidelity import average_ranks, evaluate_rows
+
+class NoiseTable:
+    """
+    A large table of standard normal noise, generated from a seed, from which each perturbation is read as a slice
+    starting at an offset, so that a perturbation is fully described by its offset and scale. Every process that
+    creates a table with the same size and seed gets the same table, so only the offsets need to be exchanged.
+    """
+    def __init__(self, size=2**24, seed=123, dtype=np.float32):
+        """
+        :param size: the number of values, which should be much larger than the number of parameters (2**24 float32 values take 64 MB)
+        """
+        self.size = size
+        self.seed = seed
+        self.noise = np.random.RandomState(seed).standard_normal(size).astype(dtype)
+
+    def get(self, offset, number_of_parameters):
+        """
+        :return: a view of the noise vector starting at the offset
+        """
+        return self.noise[offset:offset + number_of_parameters]
+
+    def sample_offsets(self, number_of_parameters, number_of_offsets):
+        return np.random.randint(0, self.size - number_of_parameters + 1, number_of_offsets)
+
+def centered_ranks(fitness_scores):
+    """
+    :return: the ranks of the fitness scores scaled to [-0.5, 0.5] (tied scores get the average of their ranks)
+    """
+    fitness_scores = np.ravel(fitness_scores)
+    if len(fitness_scores) < 2:
+        return np.zeros(len(fitness_scores))
+    return average_ranks(fitness_scores) / (len(fitness_scores) - 1) - 0.5
+
+def perturbed_parameters(parameters, perturbations, noise_table):
+    """
+    :param perturbations: a list of (offset, scale) pairs
+    :return: a matrix with parameters + scale * noise of one perturbation per row
+    """
+    number_of_parameters = len(parameters)
+    return np.vstack([parameters + scale * noise_table.get(offset, number_of_parameters) for offset, scale in perturbations])
+
+
+_worker_fitness_function = None
+_worker_noise_table = None
+
+def _initialize_worker(fitness_function, noise_table_size, noise_table_seed, noise_table_dtype, worker_initializer):
+    global _worker_fitness_function, _worker_noise_table
+    if worker_initializer is not None:
+        worker_initializer()
+    _worker_fitness_function = fitness_function
+    _worker_noise_table = NoiseTable(noise_table_size, noise_table_seed, noise_table_dtype)
+
+def _evaluate_perturbations((parameters, perturbations, generation, scenario)):
+    if scenario is not None:
+        _worker_fitness_function.use_scenario(scenario, generation)
+    return list(evaluate_rows(_worker_fitness_function, perturbed_parameters(parameters, perturbations, _worker_noise_table), generation))
+
+
+class EvolutionStrategyData:
+    """
+    Data from a generation of an EvolutionStrategy, with the same attributes as PrunedPopulationData and the state needed to continue.
+    Individual i is parameters_before_update + perturbations[i][1] * noise (see variables), so that the whole generation
+    is described by the parameters and the (offset, scale) pairs, instead of a population of chromosomes.
+    """
+    def __init__(self, generation, parameters_before_update, parameters, perturbations, fitness_scores, best_variables, optimizer_state, noise_table_seed):
+        self.generation = generation
+        self.parameters_before_update = parameters_before_update
+        self.parameters = parameters # after the update, to be used in the next generation
+        self.perturbations = perturbations
+        self.fitness_scores = fitness_scores
+        self.best_individual_index = max(xrange(len(fitness_scores)), key=fitness_scores.__getitem__)
+        self.best_fitness = fitness_scores[self.best_individual_index]
+        self.best_variables = best_variables # (a column vector)
+        self.optimizer_state = optimizer_state
+        self.noise_table_seed = noise_table_seed
+
+    def variables(self, index, noise_table):
+        """
+        :return: the parameters of individual index as a column vector
+        """
+        offset, scale = self.perturbations[index]
+        return (self.parameters_before_update + scale * noise_table.get(offset, len(self.parameters_before_update)))[:, np.newaxis]
+
+
+class EvolutionStrategy:
+    """
+    An evolution strategy in the style of OpenAI-ES, which moves one parameter vector along an estimate of the gradient
+    of the expected fitness under Gaussian perturbations, using the fitness function protocol of GeneticAlgorithm
+    (evaluate(variables, generation) or evaluate_batch(decoded_variables, generation)), with the parameters as variables.
+
+    Each generation, number_of_pairs noise vectors are read from a NoiseTable, and both parameters + sigma * noise and
+    parameters - sigma * noise are evaluated (antithetic sampling). The fitness scores are replaced by their centered
+    ranks (fitness shaping), so only their order matters, and the parameters are updated with Adam and weight decay.
+
+    With parallel=True, the evaluations are made in a pool of processes that each create the same noise table,
+    so that only the parameters and the (offset, scale) pairs are sent to them each generation. As in
+    ParallelFitnessFunction, a scenario is created once per generation in this process if the fitness function has
+    the functions create_scenario and use_scenario.
+    """
+    def __init__(self, fitness_function, initial_parameters, number_of_pairs, sigma, learning_rate, noise_table=None, weight_decay=0.0, parallel=False, number_of_processes=None, worker_initializer=None):
+        """
+        :param fitness_function: function, or object with function, evaluate(variables, generation), and optionally evaluate_batch(decoded_variables, generation)
+        :param initial_parameters: a vector with the initial parameters
+        :param number_of_pairs: the number of antithetic pairs evaluated each generation
+        :param sigma: the standard deviation of the perturbations
+        :param learning_rate: the step size of Adam
+        :param noise_table: a NoiseTable, by default one with 2**24 float32 values
+        :param weight_decay: the coefficient of the decay of the parameters towards zero
+        :param parallel: if the evaluations should be made in a pool of processes
+        :param number_of_processes: the number of worker processes, or None to use one per core
+        :param worker_initializer: an optional function called once in each worker process when it is started
+        """
+        self.fitness_function = fitness_function
+        self.noise_table = noise_table or NoiseTable()
+        self.initial_parameters = np.ravel(initial_parameters).astype(self.noise_table.noise.dtype)
+        self.number_of_pairs = number_of_pairs
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.parallel = parallel
+        self.number_of_processes = number_of_processes or multiprocessing.cpu_count()
+        self.worker_initializer = worker_initializer
+        self.pool = None
+
+    def start(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.number_of_processes, _initialize_worker,
+                                             (self.fitness_function, self.noise_table.size, self.noise_table.seed,
+                                              self.noise_table.noise.dtype, self.worker_initializer))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def run(self, num_generations=None, generation_callback=None, evolution_strategy_data=None):
+        """
+        :param num_generations: the number of generations, or None to continue indefinitely
+        :param generation_callback: an optional function generation_callback(evolution_strategy_data) returning a boolean True to continue or False to stop.
+        :param evolution_strategy_data: if None, the initial parameters are used. Otherwise, the run continues from the EvolutionStrategyData.
+        :return: an instance of EvolutionStrategyData with information about the final generation
+        """
+        if evolution_strategy_data is None:
+            parameters = self.initial_parameters.copy()
+            optimizer_state = (np.zeros_like(parameters), np.zeros_like(parameters), 0) # (first moment, second moment, number of steps)
+            generation = 1
+        else:
+            if evolution_strategy_data.noise_table_seed != self.noise_table.seed:
+                raise ValueError('The evolution strategy data was made with a different noise table!')
+            parameters = evolution_strategy_data.parameters.copy()
+            optimizer_state = evolution_strategy_data.optimizer_state
+            generation = evolution_strategy_data.generation + 1
+        number_of_parameters = len(parameters)
+
+        while True:
+
+            # Evaluate the antithetic pairs
+
+            offsets = self.noise_table.sample_offsets(number_of_parameters, self.number_of_pairs)
+            perturbations = [(offset, scale) for offset in offsets for scale in (self.sigma, -self.sigma)]
+            fitness_scores = self.evaluate(parameters, perturbations, generation)
+
+            # Update the parameters with the shaped fitness scores
+
+            ranks = centered_ranks(fitness_scores).reshape(-1, 2)
+            weights = ranks[:, 0] - ranks[:, 1]
+            gradient = np.zeros(number_of_parameters)
+            for offset, weight in zip(offsets, weights):
+                gradient += weight * self.noise_table.get(offset, number_of_parameters)
+            gradient /= len(fitness_scores)
+            step, optimizer_state = self.adam_step(gradient - self.weight_decay * parameters, optimizer_state)
+            best_individual_index = int(np.argmax(fitness_scores))
+            offset, scale = perturbations[best_individual_index]
+            best_variables = (parameters + scale * self.noise_table.get(offset, number_of_parameters))[:, np.newaxis]
+            data = EvolutionStrategyData(generation, parameters, (parameters + step).astype(parameters.dtype), perturbations,
+                                         fitness_scores, best_variables, optimizer_state, self.noise_table.seed)
+            parameters = data.parameters
+
+            # Call optional callback function and check if finished
+
+            if (generation_callback is not None and generation_callback(data) is False) or generation == num_generations:
+                return data
+            generation += 1
+
+    def evaluate(self, parameters, perturbations, generation):
+        """
+        :return: a list with the fitness score of each (offset, scale) pair
+        """
+        if not self.parallel:
+            return list(evaluate_rows(self.fitness_function, perturbed_parameters(parameters, perturbations, self.noise_table), generation))
+        self.start()
+        if hasattr(self.fitness_function, "create_scenario"):
+            scenario = self.fitness_function.create_scenario(generation)
+        else:
+            scenario = None
+        chunks = [perturbations[i::self.number_of_processes] for i in range(min(self.number_of_processes, len(perturbations)))]
+        results = self.pool.map(_evaluate_perturbations, [(parameters, chunk, generation, scenario) for chunk in chunks], chunksize=1)
+        fitness_scores = [None] * len(perturbations)
+        for i, chunk_results in enumerate(results):
+            fitness_scores[i::self.number_of_processes] = chunk_results
+        return fitness_scores
+
+    def adam_step(self, gradient, optimizer_state, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        """
+        :return: the step in the direction of the gradient (for ascent), and the new optimizer state
+        """
+        first_moment, second_moment, number_of_steps = optimizer_state
+        number_of_steps += 1
+        first_moment = beta1 * first_moment + (1 - beta1) * gradient
+        second_moment = beta2 * second_moment + (1 - beta2) * gradient**2
+        step_size = self.learning_rate * np.sqrt(1 - beta2**number_of_steps) / (1 - beta1**number_of_steps)
+        return step_size * first_moment / (np.sqrt(second_moment) + epsilon), (first_moment, second_moment, number_of_steps)
+
+
+if __name__ == "__main__":
+    def sphere(variables, generation):
+        return -float(np.sum((variables - 0.5)**2))
+
+    def callback(data):
+        if data.generation % 50 == 0:
+            print str(data.generation) + ": " + str(data.best_fitness)
+
+    table = NoiseTable(10**6)
+    for parallel in (False, True):
+        np.random.seed(0)
+        es = EvolutionStrategy(sphere, np.zeros(100), 20, 0.05, 0.02, table, parallel=parallel, number_of_processes=4)
+        data = es.run(200, callback)
+        es.close()
+        print np.allclose(data.variables(data.best_individual_index, table), data.best_variables)
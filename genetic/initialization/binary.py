@@ -1,12 +1,18 @@
 import numpy as np
 
+from genetic.packing import pack
+
 class BinaryInitialization:
-    def __init__(self, chromosome_length):
+    def __init__(self, chromosome_length, packed=False):
         """
-        :param number_of_variables: number of variables encoded in the chromosome
-        :param bits_per_variable: number of bits used to store one variable
+        :param chromosome_length: the number of genes (bits)
+        :param packed: if the chromosomes should be bit-packed (see genetic.packing)
         """
         self.chromosome_length = chromosome_length
+        self.packed = packed
 
     def initialize_chromosome(self):
-        return np.random.choice([0, 1], (self.chromosome_length, 1))
\ No newline at end of file
+        chromosome = np.random.choice([0, 1], (self.chromosome_length, 1))
+        if self.packed:
+            return pack(chromosome)
+        return chromosome
\ No newline at end of file
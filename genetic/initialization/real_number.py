@@ -1,11 +1,16 @@
 import numpy as np
 
 class RealNumberInitialization:
-    def __init__(self, chromosome_length):
+    def __init__(self, chromosome_length, dtype=np.float64):
         """
         :param chromosome_length: the number of genes
+        :param dtype: the data type of the genes, for instance np.float32 to halve the size of the population
         """
         self.chromosome_length = chromosome_length
+        self.dtype = dtype
 
     def initialize_chromosome(self):
-        return np.random.random((self.chromosome_length, 1))
\ No newline at end of file
+        return np.random.random((self.chromosome_length, 1)).astype(self.dtype, copy=False)
+
+    def initialize_population(self, population_size):
+        return np.random.random((population_size, self.chromosome_length)).astype(self.dtype, copy=False)
@@ -0,0 +1,229 @@
+import multiprocessing
+import random
+import traceback
+import numpy as np
+
+RING_TOPOLOGY = "ring"
+FULLY_CONNECTED_TOPOLOGY = "fully_connected"
+
+def migration_destinations(island_index, number_of_islands, topology):
+    """
+    :return: the indices of the islands that the specified island sends its migrants to
+    """
+    if topology == RING_TOPOLOGY:
+        return [(island_index + 1) % number_of_islands] if number_of_islands > 1 else []
+    if topology == FULLY_CONNECTED_TOPOLOGY:
+        return [i for i in range(number_of_islands) if i != island_index]
+    raise ValueError('Unknown migration topology: ' + str(topology))
+
+def migration_sources(island_index, number_of_islands, topology):
+    """
+    :return: the indices of the islands that send their migrants to the specified island
+    """
+    return [i for i in range(number_of_islands) if island_index in migration_destinations(i, number_of_islands, topology)]
+
+def encode_genome(chromosome):
+    """
+    :return: a compact buffer (kind, dtype, number_of_genes, bytes) with the genes of a chromosome,
+    where binary genes stored one per integer are sent as bits
+    """
+    genes = np.ravel(chromosome)
+    if genes.dtype.kind in "biu" and genes.size and genes.min() >= 0 and genes.max() <= 1:
+        return "bits", genes.dtype.str, genes.size, np.packbits(genes.astype(np.uint8)).tobytes()
+    return "raw", genes.dtype.str, genes.size, genes.tobytes()
+
+def decode_genome((kind, dtype, number_of_genes, buffer)):
+    """
+    :return: a flat array with the genes of a chromosome encoded using encode_genome
+    """
+    if kind == "bits":
+        return np.unpackbits(np.frombuffer(buffer, dtype=np.uint8))[:number_of_genes].astype(dtype)
+    return np.frombuffer(buffer, dtype=dtype).copy()
+
+
+class IslandModel:
+    """
+    Runs a number of independent genetic algorithms (islands) in separate processes, which every migration_interval
+    generations send copies of their best individuals to the other islands given by the topology:
+    RING_TOPOLOGY (island i sends to island i+1) or FULLY_CONNECTED_TOPOLOGY (every island sends to all others).
+    The migrants, sent as compact genome buffers together with their fitness scores,
+    replace the worst individuals of the receiving island before its next generation is formed.
+
+    The migrations are synchronous: an island waits for the migrants of the current migration from all its sources
+    that are still running before continuing.
+    """
+    def __init__(self, create_genetic_algorithm, number_of_islands, migration_interval, number_of_migrants, topology=RING_TOPOLOGY, seed=None):
+        """
+        :param create_genetic_algorithm: function create_genetic_algorithm(island_index) returning the GeneticAlgorithm of an island, called in the process of the island
+        :param number_of_islands: the number of islands, each run in its own process
+        :param migration_interval: the number of generations between migrations
+        :param number_of_migrants: the number of best individuals sent from an island to each of its destinations
+        :param topology: RING_TOPOLOGY or FULLY_CONNECTED_TOPOLOGY
+        :param seed: if specified, the random number generators of island i are seeded with seed + i. Otherwise they are seeded from the operating system, so that the islands differ.
+        """
+        self.create_genetic_algorithm = create_genetic_algorithm
+        self.number_of_islands = number_of_islands
+        self.migration_interval = migration_interval
+        self.number_of_migrants = number_of_migrants
+        self.topology = topology
+        self.seed = seed
+        migration_destinations(0, number_of_islands, topology) # check the topology
+
+    def run(self, num_generations=None, generation_callback=None, population_data_list=None):
+        """
+        :param num_generations: the number of generations of each island, or None to continue indefinitely
+        :param generation_callback: an optional function generation_callback(island_index, population_data), called in the process of the island, returning a boolean True to continue or False to stop the island. This is where each island can save its population data, for instance using its own subfolder.
+        :param population_data_list: an optional list with the population data to continue from for each island (or None for the islands to initialize)
+        :return: a list with the PopulationData of the final population of each island
+        """
+        inboxes = [multiprocessing.Queue() for _ in range(self.number_of_islands)]
+        results = multiprocessing.Queue()
+        processes = []
+        for island_index in range(self.number_of_islands):
+            population_data = population_data_list[island_index] if population_data_list is not None else None
+            process = multiprocessing.Process(target=self.run_island,
+                                              args=(island_index, inboxes, results, num_generations, generation_callback, population_data))
+            process.start()
+            processes.append(process)
+        final_population_data = [None] * self.number_of_islands
+        errors = []
+        for _ in range(self.number_of_islands):
+            island_index, data, error = results.get()
+            final_population_data[island_index] = data
+            if error is not None:
+                errors.append("Island " + str(island_index) + ":\n" + error)
+        for process in processes:
+            process.join()
+        if errors:
+            raise RuntimeError('\n'.join(errors))
+        return final_population_data
+
+    def run_island(self, island_index, inboxes, results, num_generations, generation_callback, population_data):
+        """
+        The body of the process of an island
+        """
+        if self.seed is None:
+            np.random.seed()
+            random.seed()
+        else:
+            np.random.seed(self.seed + island_index)
+            random.seed(self.seed + island_index)
+        migration = Migration(self, island_index, inboxes)
+        data, error = None, None
+        try:
+            genetic_algorithm = self.create_genetic_algorithm(island_index)
+            def callback(data):
+                if generation_callback is not None and generation_callback(island_index, data) is False:
+                    return False
+                migration.generation_done(data, genetic_algorithm)
+            data = genetic_algorithm.run(num_generations, callback, population_data)
+        except Exception:
+            error = traceback.format_exc()
+        migration.stop()
+        results.put((island_index, data, error))
+        migration.wait_for_sources()
+
+
+class Migration:
+    """
+    The migration state of one island in an IslandModel
+    """
+    def __init__(self, island_model, island_index, inboxes):
+        self.island_model = island_model
+        self.island_index = island_index
+        self.inboxes = inboxes
+        self.destinations = migration_destinations(island_index, island_model.number_of_islands, island_model.topology)
+        self.running_sources = set(migration_sources(island_index, island_model.number_of_islands, island_model.topology))
+        self.generations_run = 0
+        self.migrations = 0
+        self.received = {} # migrants that have arrived, by migration number, as lists of (genome, fitness)
+        self.migrants_received = 0
+
+    def generation_done(self, population_data, genetic_algorithm):
+        self.generations_run += 1
+        if self.generations_run % self.island_model.migration_interval == 0:
+            self.migrations += 1
+            self.send(population_data)
+            self.receive(population_data, genetic_algorithm)
+
+    def send(self, population_data):
+        fitness_scores = population_data.fitness_scores
+        best_indices = sorted(range(len(fitness_scores)), key=fitness_scores.__getitem__, reverse=True)[:self.island_model.number_of_migrants]
+        migrants = [(encode_genome(population_data.population[i]), fitness_scores[i]) for i in best_indices]
+        for destination in self.destinations:
+            self.inboxes[destination].put(("migrants", self.island_index, self.migrations, migrants))
+
+    def receive(self, population_data, genetic_algorithm):
+        """
+        Waits for the migrants of the current migration and lets them replace the worst individuals
+        """
+        migrants = []
+        waiting_for = set(self.running_sources)
+        while waiting_for:
+            for source, source_migrants in self.received.pop(self.migrations, []):
+                if source in waiting_for:
+                    migrants.extend(source_migrants)
+                    waiting_for.discard(source)
+            if waiting_for:
+                self.handle_message(self.inboxes[self.island_index].get())
+                waiting_for &= self.running_sources
+        self.replace_worst(population_data, genetic_algorithm, migrants)
+
+    def handle_message(self, message):
+        if message[0] == "stopped":
+            self.running_sources.discard(message[1])
+        else:
+            _, source, migration, migrants = message
+            self.received.setdefault(migration, []).append((source, migrants))
+
+    def replace_worst(self, population_data, genetic_algorithm, migrants):
+        population = population_data.population
+        fitness_scores = population_data.fitness_scores
+        replaceable = [i for i in range(len(population)) if i != population_data.best_individual_index]
+        worst_indices = sorted(replaceable, key=fitness_scores.__getitem__)[:len(migrants)]
+        for i, (genome, fitness) in zip(worst_indices, migrants):
+            genes = decode_genome(genome)
+            if isinstance(population, list):
+                population[i] = genes.reshape(population[i].shape).astype(population[i].dtype)
+            else:
+                population[i] = genes
+            # decoded in place, as the variable vectors may be views of the decoded population
+            decoded_variables = genetic_algorithm.decode(population[i].reshape(-1, 1))
+            population_data.decoded_variable_vectors[i][:] = np.reshape(decoded_variables, population_data.decoded_variable_vectors[i].shape)
+            fitness_scores[i] = fitness
+        self.migrants_received += len(migrants)
+
+    def stop(self):
+        for destination in self.destinations:
+            self.inboxes[destination].put(("stopped", self.island_index))
+
+    def wait_for_sources(self):
+        """
+        Receives the remaining messages until all sources have stopped, so that no process is left with unsent data
+        """
+        while self.running_sources:
+            self.handle_message(self.inboxes[self.island_index].get())
+
+
+if __name__ == "__main__":
+    from genetic.algorithm import GeneticAlgorithm
+    from genetic.crossover.single_point import SinglePointCrossover
+    from genetic.decoding.binary import BinaryDecoding
+    from genetic.elitism.elitism import Elitism
+    from genetic.initialization.binary import BinaryInitialization
+    from genetic.mutation.binary import BinaryMutation
+    from genetic.selection.tournament import TournamentSelection
+
+    def sphere(variables, generation):
+        return -float(np.sum(variables**2))
+
+    def create_genetic_algorithm(island_index):
+        return GeneticAlgorithm(30, sphere, TournamentSelection(0.75, 3), SinglePointCrossover(0.9),
+                                BinaryMutation(1.0 / 60), Elitism(1), BinaryDecoding(5, 3, 20), BinaryInitialization(60))
+
+    def callback(island_index, p):
+        if p.generation % 10 == 0:
+            print str(island_index) + ": " + str(p.generation) + ": " + str(p.best_fitness)
+
+    islands = IslandModel(create_genetic_algorithm, 4, 5, 2, FULLY_CONNECTED_TOPOLOGY, seed=1)
+    print [p.best_fitness for p in islands.run(50, callback)]
@@ -0,0 +1,165 @@
+import numpy as np
+
+from genetic.algorithm import PopulationData, extract_function
+from genetic.evaluation.multi_fidelity import evaluate_rows
+from genetic.population import batch_initialize, batch_decode, batch_select, batch_cross, batch_mutate, batch_elitism, column_views
+
+# The operators are called through their batch functions (see genetic.population) on all runs at once, except for
+# selection and elitism, which are called through these functions, or once per run if the operator does not have them:
+#
+#   select_runs(fitness_scores, number_of_selections, generation) taking a matrix with the fitness scores of one run
+#       per row and returning a matrix with the indices (within the run) of the selected individuals of one run per row
+#   elitism_runs(populations, best_individuals, generation) modifying the (runs, population size, chromosome length)
+#       array in-place, where best_individuals is a matrix with the best individual of one run per row
+
+def runwise_select(select_batch):
+    def select_runs(fitness_scores, number_of_selections, generation):
+        return np.vstack([select_batch(run_fitness_scores, number_of_selections, generation) for run_fitness_scores in fitness_scores])
+    return select_runs
+
+def runwise_elitism(elitism_batch):
+    def elitism_runs(populations, best_individuals, generation):
+        for population, best_individual in zip(populations, best_individuals):
+            elitism_batch(population, best_individual, generation)
+    return elitism_runs
+
+
+class MultiRunData:
+    """
+    Data from a generation of the runs of a MultiRunGeneticAlgorithm, with one run along the first axis of each array
+    """
+    def __init__(self, generation, population, decoded_variables, fitness_scores):
+        self.generation = generation
+        self.population = population # (runs, population size, chromosome length)
+        self.decoded_variables = decoded_variables # (runs, population size, number of variables)
+        self.fitness_scores = fitness_scores # (runs, population size)
+        self.best_individual_indices = np.argmax(fitness_scores, axis=1)
+        self.best_fitness = fitness_scores[np.arange(len(fitness_scores)), self.best_individual_indices]
+
+    def population_data(self, run_index):
+        """
+        :return: a PopulationData for one of the runs (referring to the arrays of this data)
+        """
+        return PopulationData(self.generation, self.population[run_index], column_views(self.decoded_variables[run_index]),
+                              list(self.fitness_scores[run_index]), self.best_individual_indices[run_index])
+
+
+class MultiRunGeneticAlgorithm:
+    """
+    Advances number_of_runs independent runs of a genetic algorithm in lockstep, to reduce the Python overhead per generation
+    of many small runs, such as when tuning the parameters of the operators. The populations of all runs are stored as one
+    array of shape (runs, population size, chromosome length), which the batch functions of the operators see as one
+    population matrix of runs * population size rows, except for selection and elitism, which are done within each run.
+    The fitness function is likewise applied to the decoded variables of all runs at once, through
+    evaluate_batch(decoded_variables, generation) if it has one.
+
+    The crossed children are written into a second array with all pairs of all runs, ordered by run,
+    and then gathered into the population array, so that the children of each run stay in that run.
+    """
+    def __init__(self, number_of_runs, population_size, fitness_function, selection_algorithm, crossover_algorithm, mutation_algorithm, elitism_algorithm, decoding_algorithm, initialization_algorithm):
+        """
+        The operators are the same as for GeneticAlgorithm with matrix_population=True
+        :param number_of_runs: the number of independent runs
+        :param population_size: the population size of each run (must be even)
+        :param fitness_function: function, or object with function, evaluate(variables, generation), and optionally evaluate_batch(decoded_variables, generation)
+        """
+        if population_size % 2 == 1:
+            raise ValueError('The population size must be even!')
+        self.number_of_runs = number_of_runs
+        self.population_size = population_size
+        self.fitness_function = fitness_function
+        select_batch = extract_function(selection_algorithm, "select_batch", optional=True) or batch_select(extract_function(selection_algorithm, "select"))
+        self.select_runs = extract_function(selection_algorithm, "select_runs", optional=True) or runwise_select(select_batch)
+        self.cross_batch = extract_function(crossover_algorithm, "cross_batch", optional=True) or batch_cross(extract_function(crossover_algorithm, "cross"))
+        self.mutate_batch = extract_function(mutation_algorithm, "mutate_batch", optional=True) or batch_mutate(extract_function(mutation_algorithm, "mutate"))
+        elitism_batch = extract_function(elitism_algorithm, "elitism_batch", optional=True) or batch_elitism(extract_function(elitism_algorithm, "elitism"))
+        self.elitism_runs = extract_function(elitism_algorithm, "elitism_runs", optional=True) or runwise_elitism(elitism_batch)
+        self.decode_batch = extract_function(decoding_algorithm, "decode_batch", optional=True) or batch_decode(extract_function(decoding_algorithm, "decode"))
+        self.initialize_population = extract_function(initialization_algorithm, "initialize_population", optional=True) or \
+                                     batch_initialize(extract_function(initialization_algorithm, "initialize_chromosome"))
+
+        # The children of pair k of the (runs * population size / 2 pairs) are written into rows k and k + runs * population size / 2,
+        # so the first half of run r is in rows r * population size / 2 and up, and the second half in the rows half of all rows later
+        half = population_size / 2
+        number_of_rows = number_of_runs * population_size
+        first_halves = np.arange(number_of_runs)[:, np.newaxis] * half + np.arange(half)
+        self.children_order = np.hstack((first_halves, first_halves + number_of_rows / 2)).ravel()
+        self.run_offsets = np.arange(number_of_runs)[:, np.newaxis] * population_size
+
+    def run(self, num_generations, generation_callback=None):
+        """
+        :param num_generations: the number of generations of each run
+        :param generation_callback: an optional function generation_callback(multi_run_data) returning False to stop
+        :return: a MultiRunData with the final populations
+        """
+        number_of_rows = self.number_of_runs * self.population_size
+        rows = self.initialize_population(number_of_rows)
+        children = np.empty_like(rows)
+        population = rows.reshape((self.number_of_runs, self.population_size, -1))
+        generation = 1
+        while True:
+
+            # Evaluate all runs
+
+            decoded_variables = self.decode_batch(rows)
+            fitness_scores = np.reshape(evaluate_rows(self.fitness_function, decoded_variables, generation), (self.number_of_runs, self.population_size))
+            data = MultiRunData(generation, population, decoded_variables.reshape((self.number_of_runs, self.population_size, -1)), fitness_scores)
+            if (generation_callback is not None and generation_callback(data) is False) or generation == num_generations:
+                return data
+            best_individuals = population[np.arange(self.number_of_runs), data.best_individual_indices].copy()
+
+            # Form the next generations
+
+            parent_indices = (self.select_runs(fitness_scores, self.population_size, generation) + self.run_offsets).reshape(-1, 2)
+            self.cross_batch(rows, parent_indices, children, generation)
+            np.take(children, self.children_order, axis=0, out=rows)
+            self.mutate_batch(rows, generation)
+            self.elitism_runs(population, best_individuals, generation)
+            generation += 1
+
+    def average_fitness(self, generations_per_run, generational_callback=None, runwise_callback=None):
+        """
+        Like genetic.stats.average_fitness, returns the average best fitness over the runs,
+        calling generational_callback(run_index, PopulationData) for each run between each generation if included
+        and runwise_callback(run_index, PopulationData) for each run at the end if included
+        """
+        def callback(data):
+            for run in range(self.number_of_runs):
+                generational_callback(run, data.population_data(run))
+        data = self.run(generations_per_run, callback if generational_callback is not None else None)
+        if runwise_callback is not None:
+            for run in range(self.number_of_runs):
+                runwise_callback(run, data.population_data(run))
+        return float(np.mean(data.best_fitness))
+
+
+if __name__ == "__main__":
+    import time
+    from genetic.algorithm import GeneticAlgorithm
+    from genetic.crossover.single_point import SinglePointCrossover
+    from genetic.decoding.binary import BinaryDecoding
+    from genetic.elitism.elitism import Elitism
+    from genetic.initialization.binary import BinaryInitialization
+    from genetic.mutation.binary import BinaryMutation
+    from genetic.selection.tournament import TournamentSelection
+    from genetic.stats import average_fitness
+
+    g = lambda x: (1 + (x[0] + x[1] + 1) ** 2 * (19 - 14 * x[0] + 3 * x[0] ** 2 - 14 * x[1] + 6 * x[0] * x[1] + 3 * x[1] ** 2))\
+                 *(30 + (2 * x[0] - 3 * x[1]) ** 2 * (18 - 32 * x[0] + 12 * x[0] ** 2 + 48 * x[1] - 36 * x[0] * x[1] + 27 * x[1] ** 2))
+
+    class GoldsteinPriceFitness:
+        def evaluate(self, variables, generation):
+            return 1.0 / g(variables)
+
+        def evaluate_batch(self, decoded_variables, generation):
+            return 1.0 / g(decoded_variables.T)
+
+    operators = lambda: (GoldsteinPriceFitness(), TournamentSelection(0.75, 3), SinglePointCrossover(0.9), BinaryMutation(7.0 / 60),
+                         Elitism(1), BinaryDecoding(5, 2, 30), BinaryInitialization(60))
+
+    start_time = time.time()
+    print "Serial, average fitness over 200 runs: " + str(average_fitness(GeneticAlgorithm(30, *operators()), 100, 200)),
+    print "(" + "%.2f" % (time.time() - start_time) + " s)"
+    start_time = time.time()
+    print "Lockstep, average fitness over 200 runs: " + str(MultiRunGeneticAlgorithm(200, 30, *operators()).average_fitness(100)),
+    print "(" + "%.2f" % (time.time() - start_time) + " s)"
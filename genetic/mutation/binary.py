@@ -1,16 +1,98 @@
 import random
 import numpy as np
 
+from genetic.packing import flip_packed_bits
+
+def sample_mutation_positions(mutation_probability, number_of_genes):
+    """
+    Samples the positions of the genes to mutate when each gene is mutated with the given probability,
+    using geometrically distributed gaps between the positions,
+    which takes time proportional to the expected number of mutations instead of the number of genes
+    :return: a sorted array of positions
+    """
+    if mutation_probability <= 0 or number_of_genes == 0:
+        return np.zeros(0, dtype=int)
+    if mutation_probability >= 1:
+        return np.arange(number_of_genes)
+    expected_number = number_of_genes * mutation_probability
+    number_of_gaps = int(expected_number + 4 * np.sqrt(expected_number)) + 1
+    positions = np.cumsum(np.random.geometric(mutation_probability, number_of_gaps)) - 1
+    while positions[-1] < number_of_genes:
+        positions = np.concatenate((positions, positions[-1] + np.cumsum(np.random.geometric(mutation_probability, number_of_gaps))))
+    return positions[:np.searchsorted(positions, number_of_genes)]
+
 class BinaryMutation:
-    def __init__(self, mutation_probability):
+    def __init__(self, mutation_probability, sparse=False, chromosome_length=None, packed=False):
         """
         :param mutation_probability: the gene-wise probability that a mutation will take place, typically c/m where c is constant of order 1 and m is the chromosome length
+        :param sparse: if only the positions of the genes to flip should be sampled (see sample_mutation_positions), instead of drawing a mask over the whole chromosome. This is much faster when the mutation probability is small.
+        :param chromosome_length: the number of bits in a chromosome, which is only needed for bit-packed chromosomes, so that the padding bits are never flipped
+        :param packed: if the chromosomes are bit-packed (see genetic.packing)
         """
+        if packed and chromosome_length is None:
+            raise ValueError('The chromosome length must be specified to mutate bit-packed chromosomes!')
         self.mutation_probability = mutation_probability
+        self.sparse = sparse
+        self.chromosome_length = chromosome_length
+        self.packed = packed
+        self.change_log = None
+        self.count_mutations = False # (set by GeneticAlgorithm with timing=True)
+        self.number_of_mutated_genes = 0
 
     def mutate(self, chromosome, generation):
-        selected_genes = np.random.choice([0, 1], (len(chromosome), 1), p=[1-self.mutation_probability, self.mutation_probability])
-        np.logical_xor(selected_genes, chromosome, chromosome)
+        if self.packed:
+            positions = self.mutate_packed(chromosome, 1)
+        elif self.sparse:
+            positions = sample_mutation_positions(self.mutation_probability, chromosome.size)
+            self.flip(chromosome, positions)
+        else:
+            selected_genes = np.random.choice([0, 1], (len(chromosome), 1), p=[1-self.mutation_probability, self.mutation_probability])
+            np.logical_xor(selected_genes, chromosome, chromosome)
+            positions = np.flatnonzero(selected_genes) if self.change_log is not None or self.count_mutations else None
+        if self.change_log is not None:
+            self.change_log.mutated_current(positions)
+        if self.count_mutations:
+            self.number_of_mutated_genes += len(positions)
+
+    def mutate_batch(self, population, generation):
+        """
+        Mutates all chromosomes in a population matrix in one call
+        """
+        if self.packed:
+            positions = self.mutate_packed(population, len(population))
+            chromosome_length = self.chromosome_length
+        else:
+            chromosome_length = population.shape[1]
+            if self.sparse:
+                positions = sample_mutation_positions(self.mutation_probability, population.size)
+                self.flip(population, positions)
+            else:
+                selected_genes = np.random.random(population.shape) < self.mutation_probability
+                np.logical_xor(selected_genes, population, population)
+                positions = np.flatnonzero(selected_genes) if self.change_log is not None or self.count_mutations else None
+        if self.change_log is not None:
+            self.change_log.mutated_batch(positions, chromosome_length)
+        if self.count_mutations:
+            self.number_of_mutated_genes += len(positions)
+
+    def mutate_packed(self, genes, number_of_chromosomes):
+        """
+        :return: the flat positions of the flipped bits if changes are reported to a change log or mutations are counted
+        """
+        if self.sparse:
+            positions = sample_mutation_positions(self.mutation_probability, number_of_chromosomes * self.chromosome_length)
+            flip_packed_bits(genes, positions, self.chromosome_length)
+            return positions
+        selected_genes = np.random.random((number_of_chromosomes, self.chromosome_length)) < self.mutation_probability
+        genes ^= np.packbits(selected_genes, axis=1).reshape(genes.shape)
+        if self.change_log is not None or self.count_mutations:
+            return np.flatnonzero(selected_genes)
+
+    def flip(self, genes, positions):
+        """
+        Flips the genes at the specified flat positions in-place
+        """
+        genes.flat[positions] = np.logical_not(genes.flat[positions])
 
 
 
@@ -1,6 +1,8 @@
 import random
 import numpy as np
 
+from genetic.mutation.binary import sample_mutation_positions
+
 class CreepMutation:
     def __init__(self, mutation_probability, creep_probability, creep_rate, use_normal_distribution=False):
         """
@@ -13,21 +15,44 @@ class CreepMutation:
         self.creep_probability = creep_probability
         self.creep_rate = creep_rate
         self.use_normal_distribution = use_normal_distribution
+        self.change_log = None
+        self.count_mutations = False # (set by GeneticAlgorithm with timing=True)
+        self.number_of_mutated_genes = 0
 
     def mutate(self, chromosome, generation):
-        for i in range(len(chromosome)):
-            if random.random() < self.mutation_probability:
-                if random.random() < self.creep_probability:
-                    if self.use_normal_distribution:
-                        chromosome[i] = np.clip(chromosome[i] + np.random.normal(0, self.creep_rate/2.0),
-                                                0,
-                                                1)
-                    else:
-                        chromosome[i] = np.clip(chromosome[i] - self.creep_rate/2.0 + random.random() * self.creep_rate,
-                                                0,
-                                                1)
-                else:
-                    chromosome[i] = random.random() # ordinary mutation
+        positions = self.mutate_genes(chromosome)
+        if self.change_log is not None:
+            self.change_log.mutated_current(positions)
+        if self.count_mutations:
+            self.number_of_mutated_genes += len(positions)
+
+    def mutate_batch(self, population, generation):
+        """
+        Mutates all chromosomes in a population matrix in one call
+        """
+        positions = self.mutate_genes(population)
+        if self.change_log is not None:
+            self.change_log.mutated_batch(positions, population.shape[1])
+        if self.count_mutations:
+            self.number_of_mutated_genes += len(positions)
+
+    def mutate_genes(self, genes):
+        """
+        Mutates an array of genes of any shape in-place, drawing all random numbers as arrays
+        :return: the sorted flat positions of the mutated genes
+        """
+        positions = sample_mutation_positions(self.mutation_probability, genes.size)
+        number_of_mutations = len(positions)
+        values = genes.flat[positions]
+        creep = np.random.random(number_of_mutations) < self.creep_probability
+        if self.use_normal_distribution:
+            steps = np.random.normal(0, self.creep_rate/2.0, number_of_mutations)
+        else:
+            steps = np.random.random(number_of_mutations) * self.creep_rate - self.creep_rate/2.0
+        new_values = np.random.random(number_of_mutations) # ordinary mutation
+        new_values[creep] = np.clip(values[creep] + steps[creep], 0, 1)
+        genes.flat[positions] = new_values
+        return positions
 
 
 
@@ -0,0 +1,101 @@
+"""
+Bit-packed binary chromosomes, storing eight genes per byte in a uint8 array (using np.packbits, most significant bit first)
+instead of one gene per int64. Like unpacked chromosomes they are column vectors, or rows of a population matrix.
+The padding bits at the end of the last byte are always zero.
+
+Whether chromosomes are packed is not inferred from their data type (unpacked genes may be stored as uint8 as well),
+but specified with the argument packed=True to each operator (BinaryInitialization, SinglePointCrossover,
+BinaryMutation and BinaryDecoding).
+"""
+import numpy as np
+
+def packed_length(number_of_bits):
+    """
+    :return: the number of bytes needed to store the specified number of bits
+    """
+    return (number_of_bits + 7) // 8
+
+def pack(chromosome):
+    """
+    :return: a packed column vector from an unpacked chromosome of zeros and ones
+    """
+    return np.packbits(np.ravel(chromosome).astype(np.uint8)).reshape(-1, 1)
+
+def unpack(chromosome, number_of_bits):
+    """
+    :return: an unpacked column vector of zeros and ones from a packed chromosome
+    """
+    return np.unpackbits(np.ravel(chromosome))[:number_of_bits].reshape(-1, 1).astype(int)
+
+def pack_population(population):
+    """
+    :param population: a list of unpacked chromosomes or an unpacked population matrix
+    :return: the packed population, in the same representation
+    """
+    if isinstance(population, list):
+        return map(pack, population)
+    return np.packbits(population.astype(np.uint8), axis=1)
+
+def unpack_population(population, number_of_bits):
+    """
+    :param population: a list of packed chromosomes or a packed population matrix
+    :return: the unpacked population, in the same representation
+    """
+    if isinstance(population, list):
+        return [unpack(chromosome, number_of_bits) for chromosome in population]
+    return np.unpackbits(population, axis=1)[:, :number_of_bits].astype(int)
+
+def pack_population_data(population_data):
+    """
+    Packs the population of a PopulationData in-place, for instance to continue from a checkpoint saved with unpacked chromosomes
+    :return: the same PopulationData
+    """
+    population_data.population = pack_population(population_data.population)
+    population_data.best_individual_genes = population_data.population[population_data.best_individual_index]
+    return population_data
+
+def unpack_population_data(population_data, number_of_bits):
+    """
+    Unpacks the population of a PopulationData in-place
+    :return: the same PopulationData
+    """
+    population_data.population = unpack_population(population_data.population, number_of_bits)
+    population_data.best_individual_genes = population_data.population[population_data.best_individual_index]
+    return population_data
+
+def single_point_byte_mask(crossover_points, number_of_bytes):
+    """
+    :param crossover_points: an array of bit positions
+    :return: an array with one row of byte masks per crossover point, selecting the bits from the crossover point onwards
+    """
+    byte_indices = np.arange(number_of_bytes)
+    crossover_points = np.asarray(crossover_points)[..., np.newaxis]
+    full_bytes = np.where(byte_indices > crossover_points // 8, 0xFF, 0)
+    split_byte = np.where(byte_indices == crossover_points // 8, 0xFF >> (crossover_points % 8), 0)
+    return (full_bytes | split_byte).astype(np.uint8)
+
+def flip_packed_bits(genes, bit_positions, number_of_bits, first_bit=0, total_number_of_bits=None):
+    """
+    Flips the bits at the specified positions in-place
+    :param genes: a contiguous packed chromosome or packed population matrix
+    :param bit_positions: flat bit positions, counting number_of_bits bits per chromosome (excluding the padding bits)
+    :param number_of_bits: the number of bits in one chromosome, or in the part of it that the positions refer to
+    :param first_bit: the position in the chromosome of the first bit of the part that the positions refer to
+    :param total_number_of_bits: the number of bits in one chromosome if the positions only refer to a part of it
+    """
+    number_of_bytes = packed_length(total_number_of_bits or number_of_bits)
+    chromosome_indices, bits = np.divmod(bit_positions, number_of_bits)
+    bits = bits + first_bit
+    byte_positions = chromosome_indices * number_of_bytes + bits // 8
+    np.bitwise_xor.at(genes.reshape(-1), byte_positions, (0x80 >> (bits % 8)).astype(np.uint8))
+
+
+if __name__ == "__main__":
+    c = np.array([[1], [0], [1], [1], [1], [0], [0], [0], [0], [1]])
+    p = pack(c)
+    print p.T, unpack(p, 10).T
+    flip_packed_bits(p, np.array([0, 9]), 10)
+    print unpack(p, 10).T
+    flip_packed_bits(p, np.array([0, 1]), 2, 8, 10) # (the last two bits)
+    print unpack(p, 10).T
+    print single_point_byte_mask([3, 8], 2)
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class MatrixPopulation:
+    """
+    A population stored as one contiguous 2-D array of shape (population_size, chromosome_length),
+    with one chromosome per row, together with a preallocated spare array of the same shape.
+
+    Each generation the offspring are written into the spare array, after which the two arrays swap roles,
+    so no new chromosome arrays are allocated while the algorithm runs.
+    """
+    def __init__(self, matrix):
+        """
+        :param matrix: the initial population, one chromosome per row
+        """
+        self.current = matrix
+        self.spare = np.empty_like(matrix)
+
+    def swap(self):
+        self.current, self.spare = self.spare, self.current
+
+
+def population_matrix_from_list(population):
+    """
+    Returns a population matrix with one row per chromosome from a list of column vector chromosomes
+    """
+    return np.vstack([np.ravel(chromosome) for chromosome in population])
+
+def population_list_from_matrix(matrix):
+    """
+    Returns a list of column vector chromosomes (copies) from a population matrix
+    """
+    return [np.copy(row).reshape(-1, 1) for row in matrix]
+
+def column_views(matrix):
+    """
+    Returns a list of column vector views of the rows of a matrix, which can be passed to the per-chromosome operators
+    and modified in-place
+    """
+    return [row[:, np.newaxis] for row in matrix]
+
+
+# Adapters from the per-chromosome operator protocol to the batch protocol used with a MatrixPopulation:
+#
+#   initialize_population(population_size) returning a population matrix
+#   decode_batch(population) returning a matrix with the variable values of one individual per row
+#   select_batch(fitness_scores, number_of_selections, generation) returning an array of selected indices
+#   cross_batch(source, parent_indices, destination, generation) writing the two children of the pair
+#       parent_indices[k] into rows k and k + len(parent_indices) of the destination matrix
+#   mutate_batch(population, generation) modifying the population matrix in-place
+#   elitism_batch(population, best_individual, generation) modifying the population matrix in-place
+
+def batch_initialize(initialize_chromosome):
+    def initialize_population(population_size):
+        first = initialize_chromosome()
+        population = np.empty((population_size, first.size), dtype=first.dtype)
+        population[0] = np.ravel(first)
+        for i in range(1, population_size):
+            population[i] = np.ravel(initialize_chromosome())
+        return population
+    return initialize_population
+
+def batch_decode(decode):
+    def decode_batch(population):
+        return np.vstack([np.ravel(decode(chromosome)) for chromosome in column_views(population)])
+    return decode_batch
+
+def batch_select(select):
+    def select_batch(fitness_scores, number_of_selections, generation):
+        return np.array([select(fitness_scores, generation) for _ in range(number_of_selections)])
+    return select_batch
+
+def batch_cross(cross, change_log=None):
+    def cross_batch(source, parent_indices, destination, generation):
+        number_of_pairs = len(parent_indices)
+        for k, (i, j) in enumerate(parent_indices):
+            if change_log is not None:
+                change_log.current_pair = (k, k + number_of_pairs, i, j)
+            a, b = cross((source[i][:, np.newaxis], source[j][:, np.newaxis]), generation)
+            destination[k] = np.ravel(a)
+            destination[k + number_of_pairs] = np.ravel(b)
+    return cross_batch
+
+def batch_mutate(mutate, change_log=None):
+    def mutate_batch(population, generation):
+        for i, chromosome in enumerate(column_views(population)):
+            if change_log is not None:
+                change_log.current_index = i
+            mutate(chromosome, generation)
+    return mutate_batch
+
+def batch_elitism(elitism):
+    def elitism_batch(population, best_individual, generation):
+        views = column_views(population)
+        chromosomes = list(views)
+        elitism(chromosomes, best_individual.reshape(-1, 1), generation)
+        for i, (view, chromosome) in enumerate(zip(views, chromosomes)):
+            if chromosome is not view:
+                population[i] = np.ravel(chromosome)
+    return elitism_batch
+
+
+if __name__ == "__main__":
+    m = population_matrix_from_list([np.array([[1], [2], [3]]), np.array([[4], [5], [6]])])
+    print m
+    print population_list_from_matrix(m)
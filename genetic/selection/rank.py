@@ -0,0 +1,30 @@
+import numpy as np
+
+from genetic.selection.sampling import ProportionalSelection
+
+class RankSelection(ProportionalSelection):
+    """
+    Linear ranking selection, where the selection probabilities depend only on the order of the fitness scores,
+    which therefore may have any sign and scale
+    """
+    def __init__(self, selection_pressure=1.5, use_stochastic_universal_sampling=False):
+        """
+        :param selection_pressure: between 1 (uniform selection) and 2; the expected number of selections of the best individual per selection round
+        :param use_stochastic_universal_sampling: if stochastic universal sampling should be used instead of independent draws
+        """
+        ProportionalSelection.__init__(self, self.selection_weights, use_stochastic_universal_sampling)
+        self.selection_pressure = selection_pressure
+
+    def selection_weights(self, fitness_scores):
+        n = len(fitness_scores)
+        ranks = np.empty(n)
+        ranks[np.argsort(fitness_scores, kind='mergesort')] = np.arange(n) # 0 for the worst individual
+        return (2.0 - self.selection_pressure) + 2.0 * (self.selection_pressure - 1.0) * ranks / max(n - 1, 1)
+
+
+if __name__=="__main__":
+    fitness_scores = [7, 8, 5, 2, 10]
+    r = RankSelection(1.8)
+    print [r.select(fitness_scores, 1) for _ in range(10)]
+    print r.select_batch(fitness_scores, 10, 1)
+    print RankSelection(1.8, True).select_batch(fitness_scores, 10, 1)
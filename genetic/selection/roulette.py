@@ -0,0 +1,33 @@
+import numpy as np
+
+from genetic.selection.sampling import ProportionalSelection
+
+class RouletteWheelSelection(ProportionalSelection):
+    """
+    Fitness proportional selection. If any fitness score is negative (as for EnemyFitnessFunction),
+    the scores are shifted so that the lowest one becomes zero.
+    """
+    def __init__(self, use_stochastic_universal_sampling=False):
+        """
+        :param use_stochastic_universal_sampling: if stochastic universal sampling should be used instead of independent draws
+        """
+        ProportionalSelection.__init__(self, self.selection_weights, use_stochastic_universal_sampling)
+
+    def selection_weights(self, fitness_scores):
+        lowest = np.min(fitness_scores)
+        if lowest < 0:
+            return fitness_scores - lowest
+        return fitness_scores
+
+
+if __name__=="__main__":
+    fitness_scores = [-700, -800, -500, -200, -1000]
+    r = RouletteWheelSelection()
+    print [r.select(fitness_scores, 1) for _ in range(10)]
+    print r.select_batch(fitness_scores, 10, 1)
+    print RouletteWheelSelection(True).select_batch(fitness_scores, 10, 1)
+    alias_table = r.alias_table
+    r.select(fitness_scores, 1)
+    assert r.alias_table is alias_table # (not built again for the same fitness scores and generation)
+    r.select(list(fitness_scores), 1)
+    assert r.alias_table is not alias_table
@@ -0,0 +1,103 @@
+import random
+import numpy as np
+
+class AliasTable:
+    """
+    Walker's alias method (in Vose's formulation) for sampling indices with probabilities proportional to the given weights,
+    taking O(n) time to build and O(1) time per draw
+    """
+    def __init__(self, weights):
+        """
+        :param weights: non-negative weights, not all zero
+        """
+        n = len(weights)
+        scaled = np.asarray(weights, dtype=float) * n / np.sum(weights)
+        self.probabilities = np.ones(n)
+        self.aliases = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.probabilities[s] = scaled[s]
+            self.aliases[s] = l
+            scaled[l] += scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # whatever remains has probability 1 up to rounding errors
+
+    def draw(self):
+        i = random.randint(0, len(self.probabilities) - 1)
+        return i if random.random() < self.probabilities[i] else self.aliases[i]
+
+    def draw_batch(self, number_of_draws):
+        i = np.random.randint(0, len(self.probabilities), number_of_draws)
+        return np.where(np.random.random(number_of_draws) < self.probabilities[i], i, self.aliases[i])
+
+
+def stochastic_universal_sampling(cumulative_weights, number_of_draws):
+    """
+    Draws all indices at once using equally spaced pointers with a single random offset,
+    which gives each index a number of draws within one of its expected number
+    :param cumulative_weights: the cumulative sum of the weights
+    :return: the drawn indices, in random order
+    """
+    spacing = cumulative_weights[-1] / float(number_of_draws)
+    pointers = (random.random() + np.arange(number_of_draws)) * spacing
+    indices = np.searchsorted(cumulative_weights, pointers, side='right')
+    np.minimum(indices, len(cumulative_weights) - 1, indices) # guard against rounding errors in the last pointer
+    return np.random.permutation(indices)
+
+
+class ProportionalSelection:
+    """
+    Selects individuals with probabilities proportional to weights computed from the fitness scores by a function
+    selection_weights(fitness_scores), and serves as the base class of RouletteWheelSelection and RankSelection.
+
+    The sampling structure (an AliasTable, or the cumulative weights for stochastic universal sampling) is built
+    when a different fitness score object or generation is given, after which every selection takes constant time.
+    Changes made in-place to the fitness scores are therefore not noticed: a caller that changes a score within a
+    generation must pass a new list or array (as SteadyStateGeneticAlgorithm does).
+    """
+    def __init__(self, selection_weights, use_stochastic_universal_sampling=False):
+        """
+        :param selection_weights: function selection_weights(fitness_scores) returning non-negative weights for a vector of fitness scores
+        :param use_stochastic_universal_sampling: if stochastic universal sampling should be used instead of independent draws. Each call to select then returns the next index from a set of draws made for the whole generation.
+        """
+        self.selection_weights = selection_weights
+        self.use_stochastic_universal_sampling = use_stochastic_universal_sampling
+        self.fitness_scores = None
+        self.generation = None
+        self.alias_table = None
+        self.cumulative_weights = None
+        self.drawn_indices = []
+
+    def prepare(self, fitness_scores, generation):
+        if fitness_scores is self.fitness_scores and generation == self.generation:
+            return
+        self.fitness_scores = fitness_scores
+        self.generation = generation
+        weights = self.selection_weights(np.ravel(fitness_scores).astype(float))
+        if not np.sum(weights) > 0:
+            weights = np.ones(len(weights))
+        if self.use_stochastic_universal_sampling:
+            self.cumulative_weights = np.cumsum(weights)
+            self.drawn_indices = []
+        else:
+            self.alias_table = AliasTable(weights)
+
+    def select(self, fitness_scores, generation):
+        self.prepare(fitness_scores, generation)
+        if self.use_stochastic_universal_sampling:
+            if not self.drawn_indices:
+                self.drawn_indices = list(stochastic_universal_sampling(self.cumulative_weights, len(self.cumulative_weights)))
+            return self.drawn_indices.pop()
+        return self.alias_table.draw()
+
+    def select_batch(self, fitness_scores, number_of_selections, generation):
+        self.prepare(fitness_scores, generation)
+        if self.use_stochastic_universal_sampling:
+            return stochastic_universal_sampling(self.cumulative_weights, number_of_selections)
+        return self.alias_table.draw_batch(number_of_selections)
@@ -23,6 +23,30 @@ class TournamentSelection:
             #     print str(fitness_scores[best]) + " lost"
         return ranked_competitors[-1]
 
+    def select_batch(self, fitness_scores, number_of_selections, generation):
+        """
+        Runs all tournaments at once, with the same distribution as select
+        :return: an array with the indices of the selected individuals
+        """
+        return self.select_runs(np.ravel(fitness_scores)[np.newaxis, :], number_of_selections, generation)[0]
+
+    def select_runs(self, fitness_scores, number_of_selections, generation):
+        """
+        Runs all tournaments of several independent runs at once (see MultiRunGeneticAlgorithm)
+        :param fitness_scores: a matrix with the fitness scores of one run per row
+        :return: a matrix with the indices (within the run) of the selected individuals of one run per row
+        """
+        fitness_scores = np.asarray(fitness_scores)
+        number_of_runs, population_size = fitness_scores.shape
+        runs = np.arange(number_of_runs)[:, np.newaxis, np.newaxis]
+        selections = np.arange(number_of_selections)[:, np.newaxis]
+        competitors = np.random.randint(0, population_size, (number_of_runs, number_of_selections, self.tournament_size))
+        ranking = np.argsort(-fitness_scores[runs, competitors], axis=2, kind='mergesort') # stable, like sorted
+        ranked_competitors = competitors[runs, selections, ranking]
+        accepted = np.random.random((number_of_runs, number_of_selections, self.tournament_size)) < self.tournament_selection_parameter
+        accepted[:, :, -1] = True # the lowest ranked competitor wins if no one else was accepted
+        return ranked_competitors[runs[:, :, 0], selections[:, 0], np.argmax(accepted, axis=2)]
+
 
 if __name__=="__main__":
     fitness_scores = [7, 8,5,2,10]
@@ -31,3 +55,4 @@ if __name__=="__main__":
     #f = t.select
     #i = f(fitness_scores, 1)
     print fitness_scores[i]
+    print t.select_batch(fitness_scores, 10000, 1).mean(), np.mean([t.select(fitness_scores, 1) for _ in range(10000)])
@@ -1,19 +1,56 @@
+import cPickle as pickle
+import multiprocessing
+import Queue
+import random
+import traceback
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
 
+GENERATION_EVENT = "generation"
+RUN_EVENT = "run"
+ERROR_EVENT = "error"
 
-def average_fitness(genetic_algorithm, generations_per_run, number_of_runs, generational_callback=None, runwise_callback=None):
+def run_seed(seed, run_index):
+    """
+    Returns the seed of the random number generators for one run, derived from the seed of all runs,
+    so that each run has its own reproducible random stream regardless of which process it is run in
+    """
+    return np.random.RandomState([seed, run_index]).randint(2**31)
+
+def seed_run(seed, run_index):
+    if seed is not None:
+        s = run_seed(seed, run_index)
+        np.random.seed(s)
+        random.seed(s)
+
+def average_fitness(genetic_algorithm, generations_per_run, number_of_runs, generational_callback=None, runwise_callback=None, parallel=False, number_of_processes=None, seed=None):
     """
     Returns the average best fitness over the specified number of runs,
     calling generational_callback(run_index, PopulationData) between each generation if included
     and runwise_callback(run_index, PopulationData) between each run if included,
-    """
-
 
+    With a seed, the random number generators are seeded with run_seed(seed, run_index) before each run.
+    With parallel=True, the runs are distributed over a pool of processes, each run starting from a copy of the genetic
+    algorithm as it is now, and the callbacks are called in this process in the order that the events happen in the
+    workers, so the events of different runs are interleaved (and the generational callback cannot stop a run).
+    The result is then the same as that of the serial runs with the same seed, as long as the genetic algorithm
+    does not carry any state over from one run to the next (such as a trained surrogate model).
+    The data passed to the callbacks (copies of it) is pickled in the worker as soon as the event happens, since the queue would
+    otherwise pickle it in a background thread while the run continues and reuses the buffers of the population.
+    :param parallel: if the runs should be run in parallel
+    :param number_of_processes: the number of worker processes, or None to use one per core
+    :param seed: the seed that the seeds of the runs are derived from. If None, the random state is not reset in serial runs, and a seed is drawn from it for parallel runs.
+    """
+    if parallel:
+        if seed is None:
+            seed = np.random.randint(2**31)
+        best_fitness_scores = average_fitness_in_parallel(genetic_algorithm, generations_per_run, number_of_runs, generational_callback, runwise_callback, number_of_processes, seed)
+        return sum(best_fitness_scores) / float(number_of_runs)
 
     total = 0
     for run in range(number_of_runs):
+        seed_run(seed, run)
         if generational_callback is not None:
             data = genetic_algorithm.run(generations_per_run, lambda data: generational_callback(run, data))
         else:
@@ -24,6 +61,60 @@ def average_fitness(genetic_algorithm, generations_per_run, number_of_runs, gene
     return total / float(number_of_runs)
 
 
+_worker_genetic_algorithm = None
+_worker_events = None
+
+def _initialize_worker(genetic_algorithm, events):
+    global _worker_genetic_algorithm, _worker_events
+    _worker_genetic_algorithm = genetic_algorithm
+    _worker_events = events
+
+def _run_in_worker((run, generations_per_run, seed, send_generations)):
+    """
+    Runs the genetic algorithm once, putting a GENERATION_EVENT after each generation (if send_generations)
+    and a RUN_EVENT with the final PopulationData (both pickled), or an ERROR_EVENT with the traceback, in the event queue
+    """
+    try:
+        seed_run(seed, run)
+        if send_generations:
+            data = _worker_genetic_algorithm.run(generations_per_run, lambda data: _worker_events.put((GENERATION_EVENT, run, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))))
+        else:
+            data = _worker_genetic_algorithm.run(generations_per_run)
+        _worker_events.put((RUN_EVENT, run, pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+    except Exception:
+        _worker_events.put((ERROR_EVENT, run, traceback.format_exc()))
+
+def average_fitness_in_parallel(genetic_algorithm, generations_per_run, number_of_runs, generational_callback, runwise_callback, number_of_processes, seed):
+    """
+    Returns a list with the best fitness of each run (in order of the run indices), see average_fitness
+    """
+    events = multiprocessing.Queue()
+    # (one task per process, so that every run starts from the same state of the genetic algorithm)
+    pool = multiprocessing.Pool(number_of_processes or multiprocessing.cpu_count(), _initialize_worker, (genetic_algorithm, events), maxtasksperchild=1)
+    best_fitness_scores = [None] * number_of_runs
+    try:
+        pool.map_async(_run_in_worker, [(run, generations_per_run, seed, generational_callback is not None) for run in range(number_of_runs)], chunksize=1)
+        finished_runs = 0
+        while finished_runs < number_of_runs:
+            try:
+                event, run, x = events.get(timeout=1) # (with a timeout, so that the wait can be interrupted)
+            except Queue.Empty:
+                continue
+            if event == ERROR_EVENT:
+                raise RuntimeError('Run ' + str(run) + ' failed:\n' + x)
+            data = pickle.loads(x)
+            if event == GENERATION_EVENT:
+                generational_callback(run, data)
+            else:
+                best_fitness_scores[run] = data.best_fitness
+                finished_runs += 1
+                if runwise_callback is not None:
+                    runwise_callback(run, data)
+    finally:
+        pool.terminate()
+    return best_fitness_scores
+
+
 def plot_fitness_curves(genetic_algorithm, generations_per_run, number_of_runs):
     x = np.array([[0]])
 
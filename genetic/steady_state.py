@@ -0,0 +1,229 @@
+import Queue
+import random
+
+from genetic.algorithm import PopulationData, extract_function
+from genetic.population import population_list_from_matrix
+
+REPLACE_WORST = "replace_worst"
+TOURNAMENT_REPLACEMENT = "tournament"
+
+def replaced(fitness_scores, index, fitness):
+    """
+    :return: a copy of the list of fitness scores with the score at the index replaced, since selection algorithms
+    such as RouletteWheelSelection only prepare again for a list of fitness scores that is a different object
+    """
+    fitness_scores = list(fitness_scores)
+    fitness_scores[index] = fitness
+    return fitness_scores
+
+class SteadyStateGeneticAlgorithm:
+    """
+    A steady-state genetic algorithm without a generational barrier: whenever the evaluation of an individual is done,
+    it is inserted into the population according to the replacement policy, and a new child is bred from the population
+    and dispatched for evaluation right away, so that the other evaluations never wait for the slowest one.
+
+    With a fitness function that has a function evaluate_async(variables, generation, callback), such as a
+    ParallelFitnessFunction, as many individuals as it has processes are evaluated at the same time.
+    Otherwise the individuals are evaluated one at a time with evaluate(variables, generation).
+
+    Chromosomes are stored as numpy column vectors in a list, as in GeneticAlgorithm.
+    Every snapshot_interval evaluations (by default population_size, so that a generation takes as many evaluations
+    as in GeneticAlgorithm) the generation is increased and a PopulationData snapshot is passed to the callback.
+
+    The replacement policies are
+    REPLACE_WORST: the child replaces the worst individual in the population, and
+    TOURNAMENT_REPLACEMENT: the child replaces the worst of replacement_tournament_size randomly chosen individuals.
+    The best individual is never replaced.
+
+    With reevaluate=True, the individuals of the population are evaluated again whenever the generation changes
+    (before any new children), since a fitness function such as CopterFitnessFunction changes the scenario each
+    generation, and a score from an earlier scenario (such as one lucky run on easy levels) would otherwise keep an
+    individual in the population indefinitely. These evaluations are not counted in the snapshot_interval, so a
+    generation then takes up to twice as many evaluations.
+
+    When run returns, it waits for the evaluations still in progress, whose results are discarded,
+    so that the fitness function is idle and may be closed or used again.
+    """
+    def __init__(self, population_size, fitness_function, selection_algorithm, crossover_algorithm, mutation_algorithm, decoding_algorithm, initialization_algorithm=None, replacement=REPLACE_WORST, replacement_tournament_size=3, snapshot_interval=None, reevaluate=True):
+        """
+        :param population_size: the number of individuals kept in the population
+        :param fitness_function: function, or object with function, evaluate(variables, generation) returning the fitness score, and optionally evaluate_async(variables, generation, callback) (see ParallelFitnessFunction)
+        :param selection_algorithm: function, or object with function, select(fitness_scores, generation) returning the selected chromosome
+        :param crossover_algorithm: function, or object with function, cross(pair, generation) returning the resulting crossed pair (if unchanged, return COPIES, not the original vectors). Both children are used, one after the other.
+        :param mutation_algorithm: function, or object with function, mutate(chromosome, generation) modifying the chromosome in-place
+        :param decoding_algorithm: function, or object with function, decode(chromosome) returning a column vector of variable values
+        :param initialization_algorithm: function, or object with function, initialize_chromosome() returning a new chromosome. If a population is to be specified to the run function, this is not needed.
+        :param replacement: REPLACE_WORST or TOURNAMENT_REPLACEMENT
+        :param replacement_tournament_size: the number of individuals competing to be replaced with TOURNAMENT_REPLACEMENT
+        :param snapshot_interval: the number of evaluations of new individuals per generation, by default population_size
+        :param reevaluate: if the population should be evaluated again in each new generation (for fitness functions that change with the generation)
+        """
+        if replacement not in (REPLACE_WORST, TOURNAMENT_REPLACEMENT):
+            raise ValueError('The replacement must be either REPLACE_WORST or TOURNAMENT_REPLACEMENT!')
+        self.population_size = population_size
+        self.evaluate = extract_function(fitness_function, "evaluate")
+        self.evaluate_async = extract_function(fitness_function, "evaluate_async", optional=True)
+        if self.evaluate_async is not None:
+            self.number_of_simultaneous_evaluations = getattr(fitness_function, "number_of_processes", 1)
+        else:
+            self.number_of_simultaneous_evaluations = 1
+        self.select = extract_function(selection_algorithm, "select")
+        self.cross = extract_function(crossover_algorithm, "cross")
+        self.mutate = extract_function(mutation_algorithm, "mutate")
+        self.decode = extract_function(decoding_algorithm, "decode")
+        self.initialize_chromosome = extract_function(initialization_algorithm, "initialize_chromosome")
+        self.replacement = replacement
+        self.replacement_tournament_size = replacement_tournament_size
+        self.snapshot_interval = snapshot_interval or population_size
+        self.reevaluate = reevaluate
+        self.spare_children = []
+        self.pending_reevaluations = []
+        self.number_of_evaluations_in_progress = 0
+
+    def run(self, num_generations=None, generation_callback=None, population_data=None):
+        """
+        :param num_generations: the number of generations, or None to continue indefinitely
+        :param generation_callback: an optional function generation_callback(population_data) returning a boolean True to continue or False to stop.
+        :param population_data: if None, a new population is initialized using the specified initialization_algorithm. Otherwise, the population in the specified population data is used.
+        :return: an instance of PopulationData with information about the final population
+        """
+        results = Queue.Queue() # (chromosome, variables, fitness, error, reevaluation) of the finished evaluations
+        self.spare_children = []
+        self.pending_reevaluations = []
+        self.number_of_evaluations_in_progress = 0
+        if population_data is None:
+            population, decoded_variable_vectors, fitness_scores = [], [], []
+            generation = 1
+            for i in range(self.population_size):
+                self.dispatch(self.initialize_chromosome(), generation, results)
+        else:
+            population = population_data.population
+            if not isinstance(population, list):
+                population = population_list_from_matrix(population)
+            population = list(population)
+            decoded_variable_vectors = list(population_data.decoded_variable_vectors)
+            fitness_scores = list(population_data.fitness_scores)
+            generation = population_data.generation + 1
+            if self.reevaluate:
+                self.pending_reevaluations = list(population)
+            self.dispatch_next(self.number_of_simultaneous_evaluations, population, fitness_scores, generation, results)
+
+        evaluations = 0
+        while True:
+            chromosome, variables, fitness, error, reevaluation = self.next_result(results)
+            if error is not None:
+                raise RuntimeError('The evaluation of an individual failed:\n' + error)
+            if reevaluation:
+                # (unless the individual has been replaced while it was evaluated)
+                for i, individual in enumerate(population):
+                    if individual is chromosome:
+                        fitness_scores = replaced(fitness_scores, i, fitness)
+                self.dispatch_next(1, population, fitness_scores, generation, results)
+                continue
+            if len(population) < self.population_size:
+                population.append(chromosome)
+                decoded_variable_vectors.append(variables)
+                fitness_scores.append(fitness)
+                if len(population) == self.population_size:
+                    self.dispatch_next(self.number_of_simultaneous_evaluations, population, fitness_scores, generation, results)
+            else:
+                i = self.replacement_index(fitness_scores)
+                population[i] = chromosome
+                decoded_variable_vectors[i] = variables
+                fitness_scores = replaced(fitness_scores, i, fitness)
+                self.dispatch_next(1, population, fitness_scores, generation, results)
+            evaluations += 1
+
+            # Take a snapshot, call optional callback function and check if finished
+
+            if evaluations % self.snapshot_interval == 0 and len(population) == self.population_size:
+                best_individual_index = max(xrange(len(fitness_scores)), key=fitness_scores.__getitem__)
+                data = PopulationData(generation, list(population), list(decoded_variable_vectors), list(fitness_scores), best_individual_index)
+                if (generation_callback is not None and generation_callback(data) is False) or generation == num_generations:
+                    self.wait_for_evaluations_in_progress(results)
+                    return data
+                generation += 1
+                if self.reevaluate:
+                    self.pending_reevaluations = list(population)
+
+    def dispatch(self, chromosome, generation, results, reevaluation=False):
+        """
+        Starts the evaluation of a chromosome, putting the result in the results queue when it is done
+        """
+        variables = self.decode(chromosome)
+        self.number_of_evaluations_in_progress += 1
+        if self.evaluate_async is not None:
+            self.evaluate_async(variables, generation, lambda (fitness, error): results.put((chromosome, variables, fitness, error, reevaluation)))
+        else:
+            results.put((chromosome, variables, self.evaluate(variables, generation), None, reevaluation))
+
+    def dispatch_next(self, number_of_evaluations, population, fitness_scores, generation, results):
+        """
+        Starts the evaluations of the individuals waiting to be evaluated again, if any, and otherwise of new children
+        """
+        for _ in range(number_of_evaluations):
+            if self.pending_reevaluations:
+                self.dispatch(self.pending_reevaluations.pop(0), generation, results, reevaluation=True)
+            else:
+                self.dispatch(self.breed(population, fitness_scores, generation), generation, results)
+
+    def breed(self, population, fitness_scores, generation):
+        """
+        Returns a new child, crossing a new pair of parents every other time
+        """
+        if not self.spare_children:
+            pair = [population[self.select(fitness_scores, generation)] for _ in range(2)]
+            children = list(self.cross(pair, generation))
+            for child in children:
+                self.mutate(child, generation)
+            self.spare_children = children
+        return self.spare_children.pop(0)
+
+    def replacement_index(self, fitness_scores):
+        """
+        Returns the index of the individual to replace, which is never the best one
+        """
+        best_individual_index = max(xrange(len(fitness_scores)), key=fitness_scores.__getitem__)
+        if self.replacement == REPLACE_WORST:
+            candidates = xrange(len(fitness_scores))
+        else:
+            candidates = [random.randint(0, len(fitness_scores)-1) for _ in range(self.replacement_tournament_size)]
+        candidates = [i for i in candidates if i != best_individual_index] or [i for i in xrange(len(fitness_scores)) if i != best_individual_index]
+        return min(candidates, key=fitness_scores.__getitem__)
+
+    def next_result(self, results):
+        while True:
+            try:
+                result = results.get(timeout=1) # (with a timeout, so that the wait can be interrupted)
+                self.number_of_evaluations_in_progress -= 1
+                return result
+            except Queue.Empty:
+                pass
+
+    def wait_for_evaluations_in_progress(self, results):
+        while self.number_of_evaluations_in_progress > 0:
+            self.next_result(results)
+
+
+if __name__ == "__main__":
+    import numpy as np
+    from genetic.crossover.single_point import SinglePointCrossover
+    from genetic.decoding.binary import BinaryDecoding
+    from genetic.evaluation.parallel import ParallelFitnessFunction
+    from genetic.initialization.binary import BinaryInitialization
+    from genetic.mutation.binary import BinaryMutation
+    from genetic.selection.tournament import TournamentSelection
+
+    def sphere(variables, generation):
+        return -float(np.sum(variables**2))
+
+    def callback(p):
+        if p.generation % 10 == 0:
+            print str(p.generation) + ": " + str(p.best_fitness)
+
+    for fitness_function in (sphere, ParallelFitnessFunction(sphere, 4)):
+        ga = SteadyStateGeneticAlgorithm(30, fitness_function, TournamentSelection(0.75, 3), SinglePointCrossover(0.9),
+                                         BinaryMutation(1.0 / 60), BinaryDecoding(5, 3, 20), BinaryInitialization(60),
+                                         TOURNAMENT_REPLACEMENT)
+        ga.run(50, callback)
+    fitness_function.close()
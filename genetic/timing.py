@@ -0,0 +1,83 @@
+import time
+
+DECODE = "decode"
+EVALUATE = "evaluate"
+SELECT = "select"
+CROSS = "cross"
+MUTATE = "mutate"
+ELITISM = "elitism"
+CALLBACK = "callback"
+PHASES = (DECODE, EVALUATE, SELECT, CROSS, MUTATE, ELITISM, CALLBACK)
+
+class PhaseTimings:
+    """
+    The wall time spent in each phase of GeneticAlgorithm.run since the previous PopulationData, i.e. in the callback
+    of the previous generation, in forming this generation, and in decoding and evaluating it, together with
+    the number of individuals evaluated by the fitness function (excluding cached and skipped ones) and the number
+    of mutated genes (None if the mutation algorithm does not count them)
+    """
+    def __init__(self, generation, phase_times, total_time, number_of_evaluations, number_of_mutated_genes):
+        self.generation = generation
+        self.phase_times = phase_times # seconds per phase name
+        self.total_time = total_time # including the time not spent in any of the phases
+        self.number_of_evaluations = number_of_evaluations
+        self.number_of_mutated_genes = number_of_mutated_genes
+
+    def __str__(self):
+        return "generation " + str(self.generation) + ": " + \
+               ", ".join(phase + " " + "%.4f" % self.phase_times[phase] for phase in PHASES) + \
+               ", total " + "%.4f" % self.total_time + " s, " + str(self.number_of_evaluations) + " evaluations" + \
+               ("" if self.number_of_mutated_genes is None else ", " + str(self.number_of_mutated_genes) + " mutated genes")
+
+
+class PhaseTimer:
+    """
+    Accumulates the wall time of the phases of a generation, either between calls to start and stop,
+    or in the calls to a function wrapped with timed, which is used for the operators whose calls are interleaved
+    (such as the per-pair selection and crossover)
+    """
+    def __init__(self, mutation_counter=None):
+        """
+        :param mutation_counter: an optional mutation algorithm with an attribute number_of_mutated_genes that it increases
+        """
+        self.mutation_counter = mutation_counter
+        self.reset()
+
+    def reset(self):
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.number_of_evaluations = 0
+        self.number_of_mutated_genes = self.mutation_counter.number_of_mutated_genes if self.mutation_counter is not None else None
+        self.start_time = self.cycle_start_time = time.time()
+
+    def start(self):
+        self.start_time = time.time()
+
+    def stop(self, phase):
+        """
+        Adds the time since the last call to start or stop to the phase
+        """
+        now = time.time()
+        self.phase_times[phase] += now - self.start_time
+        self.start_time = now
+
+    def timed(self, phase, function):
+        """
+        :return: a function that calls the function and adds the time of each call to the phase
+        """
+        def timed_function(*args):
+            start_time = time.time()
+            result = function(*args)
+            self.phase_times[phase] += time.time() - start_time
+            return result
+        return timed_function
+
+    def collect(self, generation):
+        """
+        :return: the PhaseTimings since the last call to collect (or reset), after which the timer starts over
+        """
+        number_of_mutated_genes = None
+        if self.mutation_counter is not None:
+            number_of_mutated_genes = self.mutation_counter.number_of_mutated_genes - self.number_of_mutated_genes
+        timings = PhaseTimings(generation, self.phase_times, time.time() - self.cycle_start_time, self.number_of_evaluations, number_of_mutated_genes)
+        self.reset()
+        return timings
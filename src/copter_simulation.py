@@ -3,16 +3,31 @@ import numpy as np
 from copter import Copter
 from enemy import Enemy
 from genetic.algorithm import GeneticAlgorithm
+from genetic.curriculum import CurriculumScheduler
+from genetic.crossover.blend import BlendCrossover
 from genetic.crossover.single_point import SinglePointCrossover
 from genetic.decoding.binary import BinaryDecoding
+from genetic.decoding.real_number import RealNumberDecoding
 from genetic.elitism.elitism import Elitism
+from genetic.evaluation.cache import FitnessCache, GENERATION_SCOPE
+from genetic.evaluation.parallel import ParallelFitnessFunction
+from genetic.evaluation.multi_fidelity import MultiFidelityFitnessFunction
+from genetic.evaluation.racing import RacingFitnessFunction
+from genetic.evaluation.surrogate import SurrogateFilter, NearestNeighbourSurrogate
+from genetic.evolution_strategies import EvolutionStrategy, NoiseTable
 from genetic.initialization.binary import BinaryInitialization
-from genetic.mutation.binary import BinaryMutation
+from genetic.initialization.real_number import RealNumberInitialization
+from genetic.island import IslandModel, RING_TOPOLOGY
+from genetic.mutation.binary import BinaryMutation, sample_mutation_positions
+from genetic.mutation.creep import CreepMutation
+from genetic.packing import flip_packed_bits, pack_population_data
+from genetic.population import column_views
 from genetic.selection.tournament import TournamentSelection
+from genetic.steady_state import SteadyStateGeneticAlgorithm, REPLACE_WORST
 from graphics import Graphics
 from level import generate_level
 from neural_net_integration import evocopter_neural_net_integration, black_neural_net_integration
-from population_data_io import save_population_data, load_population_data
+from population_data_io import save_population_data, load_population_data, iterate_population_data, convert_to_real_coded
 from radar_system import RadarSystem, EnemysRadarSystem
 from score_colors import get_color_from_score
 from shot import Shot
@@ -355,20 +370,75 @@ min_x = base_start_x+view_offset+5*enemy_width
 
 copter_subfoldername = "copter"
 enemy_subfoldername = "enemy"
+copter_evolution_strategy_subfoldername = "copter_evolution_strategy"
+
+def get_subfoldername(subfoldername, real_coded=False):
+    """
+    :return: the subfolder of the real-coded populations (one float32 gene per network weight, see get_network_operators) if real_coded
+    """
+    return subfoldername + "_real_coded" if real_coded else subfoldername
 
 
 short_level_length = base_start_x + 5000
 num_enemies = 5
 num_short_levels = 7
 
-new_level = generate_level(short_level_length)
-s = CopterSimulation(new_level, Copter(np.array([[start_x], [new_level.y_center(start_x)]]), 20),
-                     RadarSystem())
-neural_net_integration = evocopter_neural_net_integration(s)
-s.set_main_neural_net_integration(neural_net_integration)
 
-enemy_neural_net_integration = black_neural_net_integration(s)
-s.set_enemy_neural_net_integration(enemy_neural_net_integration)
+class SimulationProfile:
+    """
+    Settings that trade the accuracy of the simulation for speed:
+    the time step, the x step size of the radars (keeping their range), the maximum number of timesteps,
+    the length and number of the mini-levels, and the number of enemies in each of them
+    """
+    def __init__(self, delta_t=1.0/4, radar_x_step_size=4, end_at_time=10000, level_length=short_level_length, number_of_levels=num_short_levels, number_of_enemies=num_enemies):
+        self.delta_t = delta_t
+        self.radar_x_step_size = radar_x_step_size
+        self.end_at_time = end_at_time
+        self.level_length = level_length
+        self.number_of_levels = number_of_levels
+        self.number_of_enemies = number_of_enemies
+
+    def apply(self, sim):
+        sim.delta_t = self.delta_t
+        sim.end_at_time = self.end_at_time
+        for radar in sim.radar_system.radars + sim.enemys_radar_system.radars:
+            if radar.x_step_size != self.radar_x_step_size:
+                radar.set_x_step_size(self.radar_x_step_size)
+
+full_fidelity_profile = SimulationProfile()
+# twice the time step and radar step size, and a fourth of the timesteps (the same simulated time as 2500 full-fidelity timesteps) on 3 half as long levels
+low_fidelity_profile = SimulationProfile(1.0/2, 8, 1250, base_start_x + 2500, 3)
+
+# Multi-fidelity pre-screening (see genetic.evaluation.multi_fidelity): the individuals are first evaluated with
+# the low-fidelity profile, after which the 20 best of them and 4 others are evaluated with full fidelity
+pre_screening_full_evaluations = 20
+pre_screening_exploration_evaluations = 4
+
+# Curriculum (see genetic.curriculum): the copters first learn to fly short levels with a single enemy, and then
+# longer levels with more enemies, moving on when the best fitness has not improved for copter_curriculum_patience generations
+copter_curriculum_stages = [SimulationProfile(end_at_time=2000, level_length=base_start_x + 1500, number_of_enemies=1),
+                            SimulationProfile(end_at_time=4000, level_length=base_start_x + 3000, number_of_enemies=3),
+                            full_fidelity_profile]
+copter_curriculum_patience = 10
+
+def initialize_simulation():
+    """
+    Builds the simulation, with its radar systems and neural net integrations, used for the evaluations in this process
+    (called once at import, and once at startup in each worker process when evaluating in parallel)
+    """
+    global s, neural_net_integration, enemy_neural_net_integration
+    new_level = generate_level(short_level_length)
+    s = CopterSimulation(new_level, Copter(np.array([[start_x], [new_level.y_center(start_x)]]), 20),
+                         RadarSystem())
+    neural_net_integration = evocopter_neural_net_integration(s)
+    s.set_main_neural_net_integration(neural_net_integration)
+
+    enemy_neural_net_integration = black_neural_net_integration(s)
+    s.set_enemy_neural_net_integration(enemy_neural_net_integration)
+
+    s.end_at_time = 10000
+
+initialize_simulation()
 
 
 global short_levels_and_enemy_positions
@@ -376,29 +446,87 @@ short_levels_and_enemy_positions = [] # pairs of (level, enemy_positions) for ea
 
 
 
-def get_custom_mutation(m):
+def get_custom_mutation(m, packed=False):
     probability_of_initial_h_grand_mutation = 0.025
     initial_h_grand_mutation_gene_mutation_rate = 0.1
     initial_h_len = 50*30
-    normalMutation = BinaryMutation(7.0 / m)
+    normalMutation = BinaryMutation(7.0 / m, sparse=True, chromosome_length=m, packed=packed)
     grandMutation = BinaryMutation(initial_h_grand_mutation_gene_mutation_rate)
     def customMutation(chromosome, generation):
         normalMutation.mutate(chromosome, generation)
         if np.random.rand() < probability_of_initial_h_grand_mutation:
-            grandMutation.mutate(chromosome[-initial_h_len:], generation)
+            if packed:
+                # (the initial h is not byte aligned, so its bits are flipped at an offset into the packed chromosome)
+                positions = sample_mutation_positions(initial_h_grand_mutation_gene_mutation_rate, initial_h_len)
+                flip_packed_bits(chromosome, positions, initial_h_len, m - initial_h_len, m)
+            else:
+                grandMutation.mutate(chromosome[-initial_h_len:], generation)
     return customMutation
 
+class RealCodedCustomMutation:
+    """
+    The real-coded counterpart of get_custom_mutation, with creep mutations of about 7 weights per chromosome
+    and occasional grand mutations of the initial h, done on the whole population matrix at once
+    """
+    def __init__(self, number_of_variables):
+        self.probability_of_initial_h_grand_mutation = 0.025
+        self.initial_h_len = 50
+        self.normal_mutation = CreepMutation(7.0 / number_of_variables, 0.9, 0.02, use_normal_distribution=True)
+        self.grand_mutation = CreepMutation(0.1, 0.0, 0.0)
+
+    def mutate(self, chromosome, generation):
+        self.mutate_batch(chromosome.reshape(1, -1), generation)
+
+    def mutate_batch(self, population, generation):
+        self.normal_mutation.mutate_batch(population, generation)
+        grand = np.flatnonzero(np.random.random(len(population)) < self.probability_of_initial_h_grand_mutation)
+        if len(grand):
+            initial_h = population[grand, -self.initial_h_len:]
+            self.grand_mutation.mutate_genes(initial_h)
+            population[grand, -self.initial_h_len:] = initial_h
+
+def get_network_operators(number_of_variables, real_coded=False, packed=True):
+    """
+    :return: the crossover, mutation, decoding and initialization algorithms for a network with the specified number of variables,
+    either with 30 bits per variable, bit-packed if packed (see genetic.packing), or real-coded with one float32 gene per variable (used with a matrix population)
+    """
+    if real_coded:
+        return BlendCrossover(0.9, 0.5), RealCodedCustomMutation(number_of_variables), RealNumberDecoding(5), \
+               RealNumberInitialization(number_of_variables, np.float32)
+    var_size = 30
+    m = number_of_variables * var_size
+    return SinglePointCrossover(0.9, m, packed), get_custom_mutation(m, packed), BinaryDecoding(5, number_of_variables, var_size, packed=packed), \
+           BinaryInitialization(m, packed)
+
+def load_network_population_data(subfoldername, number_of_variables, real_coded=False, packed=True):
+    """
+    Loads the latest population data in the subfolder for a run with the operators of get_network_operators,
+    packing the chromosomes of checkpoints saved with unpacked binary chromosomes
+    :return: the population data, or None if there is none
+    """
+    population_data = load_population_data(subfoldername, -1)
+    if population_data is not None and packed and not real_coded:
+        if np.size(population_data.population[0]) == number_of_variables * 30: # (unpacked, one gene per bit)
+            pack_population_data(population_data)
+    return population_data
+
+def convert_checkpoints_to_real_coded():
+    """
+    Converts the saved binary-coded copter and enemy populations to real-coded ones, so that the evolution can continue real-coded
+    """
+    for subfoldername in (copter_subfoldername, enemy_subfoldername):
+        convert_to_real_coded(subfoldername, get_subfoldername(subfoldername, True), RealNumberDecoding(5), np.float32)
 
 
 
 
-s.end_at_time = 10000
 
-def generate_mini_levels_and_enemy_positions():
+def generate_mini_levels_and_enemy_positions(level_length=None, number_of_levels=None, number_of_enemies=None):
+    level_length = level_length or short_level_length
     result = []
-    for i in range(num_short_levels):
-        level = generate_level(short_level_length)
-        ep = get_enemy_positions(short_level_length, num_enemies, level, enemy_width, min_x)
+    for i in range(number_of_levels or num_short_levels):
+        level = generate_level(level_length)
+        ep = get_enemy_positions(level_length, number_of_enemies or num_enemies, level, enemy_width, min_x)
         result.append((level, ep))
     return result
 
@@ -422,7 +550,7 @@ def run_evaluations(levels_and_enemy_positions, fitness_calculator, use_graphics
     fitness_total = 0.0
     for level, positions in levels_and_enemy_positions:
         fitness_total += run_evaluation(level, positions, fitness_calculator, use_graphics)
-    return fitness_total / num_short_levels
+    return fitness_total / len(levels_and_enemy_positions)
 
 
 def watch_copter_vs_enemies():
@@ -441,18 +569,34 @@ def watch_copter_vs_enemies():
         fitness = run_copter_evaluation(copter_variables, True)
         print "Average copter distance: " + str(fitness)
 
+ENEMY_DEATH_PENALTY = 300.0
+
+def enemy_fitness_calculator(sim):
+    return - sim.get_copter_distance_travelled() - ENEMY_DEATH_PENALTY * sim.number_of_enemy_deaths
+
+def copter_fitness_calculator(sim):
+    return sim.get_copter_distance_travelled()
+
 def run_enemy_evaluation(variables, use_graphics=False):
     enemy_neural_net_integration.set_weights_and_possibly_initial_h(variables)
-    ENEMY_DEATH_PENALTY = 300.0
-    def fitness_calculator(sim):
-        return - sim.get_copter_distance_travelled() - ENEMY_DEATH_PENALTY * sim.number_of_enemy_deaths
-    return run_evaluations(short_levels_and_enemy_positions, fitness_calculator, use_graphics)
+    return run_evaluations(short_levels_and_enemy_positions, enemy_fitness_calculator, use_graphics)
 
 def run_copter_evaluation(variables, use_graphics=False):
     neural_net_integration.set_weights_and_possibly_initial_h(variables)
-    def fitness_calculator(sim):
-        return sim.get_copter_distance_travelled()
-    return run_evaluations(short_levels_and_enemy_positions, fitness_calculator, use_graphics)
+    return run_evaluations(short_levels_and_enemy_positions, copter_fitness_calculator, use_graphics)
+
+def run_stage_evaluation(stage, fitness_calculator):
+    """
+    :return: the fitness score on the mini-level with the specified index, and the number of timesteps it took
+    """
+    level, positions = short_levels_and_enemy_positions[stage]
+    fitness = run_evaluation(level, positions, fitness_calculator)
+    return fitness, s.timestep
+
+# Racing evaluation (see genetic.evaluation.racing): all individuals are run on the first 2 mini-levels,
+# those in the top half on 4, and those still in the top half after that on all of them
+racing_stage_schedule = (2, 4)
+racing_top_fraction = 0.5
 
 
 def load_latest_enemy_network():
@@ -467,44 +611,120 @@ def load_latest_copter_network():
 
 
 class CopterFitnessFunction:
-    def __init__(self):
+    def __init__(self, profile=full_fidelity_profile, curriculum=None, opponent_subfoldername=enemy_subfoldername):
+        """
+        :param profile: the SimulationProfile used for the evaluations
+        :param curriculum: an optional CurriculumScheduler with SimulationProfile stages, whose current stage is used instead of the profile
+        :param opponent_subfoldername: the subfolder of the enemy populations, whose latest best network is used
+        """
         self.last_generation = -1
+        self.profile = profile
+        self.opponent_subfoldername = opponent_subfoldername
+        self.curriculum = curriculum
+        self.scenario_profile = profile
+        self.levels_and_enemy_positions = None
 
         self.debug_ind_n = 1
 
-    def evaluate(self, variables, generation):
+    def get_profile(self):
+        return self.curriculum.current_stage if self.curriculum is not None else self.profile
+
+    @property
+    def number_of_stages(self):
+        return self.get_profile().number_of_levels
+
+    def create_scenario(self, generation):
+        """
+        :return: the mini-levels with enemy positions, the latest enemy network variables and the profile that are used for all evaluations in the generation
+        """
+        profile = self.get_profile()
+        return generate_mini_levels_and_enemy_positions(profile.level_length, profile.number_of_levels, profile.number_of_enemies), \
+               load_population_data(self.opponent_subfoldername, -1).best_variables, profile
+
+    def use_scenario(self, scenario, generation):
+        self.last_generation = generation
+        global short_levels_and_enemy_positions
+        short_levels_and_enemy_positions, enemy_variables, self.scenario_profile = scenario
+        self.levels_and_enemy_positions = short_levels_and_enemy_positions
+        enemy_neural_net_integration.set_weights_and_possibly_initial_h(enemy_variables)
+        self.debug_ind_n = 1
+
+    def start_generation(self, generation):
+        self.use_scenario(self.create_scenario(generation), generation)
+
+    def activate(self, generation):
+        """
+        Makes the simulation use the profile and the mini-levels of this fitness function,
+        which may have been changed by another one (such as the low-fidelity one used for pre-screening)
+        """
         if generation != self.last_generation:
-            self.last_generation = generation
-            global short_levels_and_enemy_positions
-            short_levels_and_enemy_positions = generate_mini_levels_and_enemy_positions()
-            load_latest_enemy_network()
-            self.debug_ind_n = 1
+            self.start_generation(generation)
+        self.scenario_profile.apply(s)
+        global short_levels_and_enemy_positions
+        short_levels_and_enemy_positions = self.levels_and_enemy_positions
+
+    def evaluate(self, variables, generation):
+        self.activate(generation)
         fitness = run_copter_evaluation(variables, False)
         print get_color_from_score(fitness, False) + str(int(fitness)),
         #print "("+str(self.debug_ind_n) + "): " + str(fitness)
         self.debug_ind_n += 1
         return fitness
 
+    def evaluate_batch(self, decoded_variables, generation):
+        return [self.evaluate(variables, generation) for variables in column_views(decoded_variables)]
+
+    def evaluate_stage(self, variables, stage, generation):
+        self.activate(generation)
+        neural_net_integration.set_weights_and_possibly_initial_h(variables)
+        return run_stage_evaluation(stage, copter_fitness_calculator)
+
 class EnemyFitnessFunction:
-    def __init__(self):
+    def __init__(self, opponent_subfoldername=copter_subfoldername):
+        """
+        :param opponent_subfoldername: the subfolder of the copter populations, whose latest best network is used
+        """
         self.last_generation = -1
+        self.opponent_subfoldername = opponent_subfoldername
+        self.number_of_stages = num_short_levels
+
+        self.debug_ind_n = 1
 
+    def create_scenario(self, generation):
+        """
+        :return: the mini-levels with enemy positions and the latest copter network variables that are used for all evaluations in the generation
+        """
+        return generate_mini_levels_and_enemy_positions(), load_population_data(self.opponent_subfoldername, -1).best_variables
+
+    def use_scenario(self, scenario, generation):
+        self.last_generation = generation
+        global short_levels_and_enemy_positions
+        short_levels_and_enemy_positions, copter_variables = scenario
+        neural_net_integration.set_weights_and_possibly_initial_h(copter_variables)
         self.debug_ind_n = 1
 
+    def start_generation(self, generation):
+        self.use_scenario(self.create_scenario(generation), generation)
+
     def evaluate(self, variables, generation):
         if generation != self.last_generation:
-            self.last_generation = generation
-            global short_levels_and_enemy_positions
-            short_levels_and_enemy_positions = generate_mini_levels_and_enemy_positions()
-            load_latest_copter_network()
-            self.debug_ind_n = 1
+            self.start_generation(generation)
         fitness = run_enemy_evaluation(variables, False)
         print get_color_from_score(fitness, True) + str(int(fitness)),
         #print "("+str(self.debug_ind_n) + "): " + str(fitness)
         self.debug_ind_n += 1
         return fitness
 
-def run_evolution_on_enemy():
+    def evaluate_batch(self, decoded_variables, generation):
+        return [self.evaluate(variables, generation) for variables in column_views(decoded_variables)]
+
+    def evaluate_stage(self, variables, stage, generation):
+        if generation != self.last_generation:
+            self.start_generation(generation)
+        enemy_neural_net_integration.set_weights_and_possibly_initial_h(variables)
+        return run_stage_evaluation(stage, enemy_fitness_calculator)
+
+def run_evolution_on_enemy(parallel=False, racing=False, surrogate=False, real_coded=False):
     # copter_population_data = load_population_data(copter_subfoldername, -1)
     # neural_net_integration.set_weights_and_possibly_initial_h(copter_population_data.best_variables)
     # load_latest_copter_network()
@@ -513,36 +733,42 @@ def run_evolution_on_enemy():
     s.end_when_all_enemies_die = False
 
     vars = enemy_neural_net_integration.get_number_of_variables()
-    var_size = 30
-    m = vars * var_size
-
-
+    subfoldername = get_subfoldername(enemy_subfoldername, real_coded)
+    crossover, mutation, decoding, initialization = get_network_operators(vars, real_coded)
 
+    fitness_function = get_fitness_function(EnemyFitnessFunction(get_subfoldername(copter_subfoldername, real_coded)), parallel, racing)
 
     ga = GeneticAlgorithm(80,
-                          EnemyFitnessFunction(),
+                          fitness_function,
                           TournamentSelection(0.75, 3),
-                          SinglePointCrossover(0.9),
-                          get_custom_mutation(m),
+                          crossover,
+                          mutation,
                           Elitism(1),
-                          BinaryDecoding(5, vars, var_size),
-                          BinaryInitialization(m))
+                          decoding,
+                          initialization,
+                          matrix_population=real_coded,
+                          fitness_cache=FitnessCache(80, GENERATION_SCOPE),
+                          surrogate_filter=get_surrogate_filter(subfoldername) if surrogate else None)
 
     def enemy_callback(p, watch_only=False):
         # if p.generation == 100:
         if not watch_only:
-            save_population_data(enemy_subfoldername, p, keep_last_n=10)
+            save_population_data(subfoldername, p, keep_last_n=10)
         average_fitness = sum(p.fitness_scores) / len(p.fitness_scores)
         print "\n[ " + str(p.generation) + ": " + str(
             p.best_fitness) + " : " + str(
             average_fitness) + " ]\n\n"
+        if racing:
+            print_racing_report(p)
+        if surrogate:
+            print "Surrogate: " + ga.surrogate_filter.report(1) + "\n"
         # if watch_only or (graphics is not None and p.generation % 10 == 0):
         #     fitness = run_enemy_evaluation(p.best_variables, True)
         #     print "Fitness: " + str(fitness)
 
 
     watch_only = False
-    enemy_population_data = load_population_data(enemy_subfoldername, -1)
+    enemy_population_data = load_network_population_data(subfoldername, vars, real_coded)
     # g = enemy_population_data.best_individual_genes
 
     if True:
@@ -557,7 +783,144 @@ def run_evolution_on_enemy():
         else:
             ga.run(None, enemy_callback, population_data=enemy_population_data)
 
-def run_evolution_on_copter():
+def get_fitness_function(fitness_function, parallel=False, racing=False):
+    if parallel and racing:
+        raise ValueError('Racing evaluation cannot be combined with parallel evaluation!')
+    if parallel:
+        return ParallelFitnessFunction(fitness_function, worker_initializer=initialize_simulation)
+    if racing:
+        return RacingFitnessFunction(fitness_function, racing_stage_schedule, racing_top_fraction)
+    return fitness_function
+
+def print_racing_report(p):
+    number_of_partial = sum(1 for fraction in p.evaluated_fractions if fraction < 1)
+    print "Racing: " + str(number_of_partial) + " partial evaluations, " + str(
+        p.evaluation_cost) + " timesteps run, about " + str(
+        p.saved_evaluation_cost) + " timesteps saved\n"
+
+def get_surrogate_filter(subfoldername):
+    """
+    :return: a SurrogateFilter with a k-nearest neighbour model trained on all saved generations in the subfolder
+    """
+    surrogate_filter = SurrogateFilter(NearestNeighbourSurrogate(k=5, max_size=4000), threshold_quantile=0.5, evaluated_fraction=0.2)
+    for population_data in iterate_population_data(subfoldername):
+        surrogate_filter.train_on_population_data(population_data)
+    return surrogate_filter
+
+def get_copter_genetic_algorithm(parallel=False, racing=False, pre_screening=False, surrogate=False, curriculum=False, real_coded=False):
+    vars = neural_net_integration.get_number_of_variables()
+    crossover, mutation, decoding, initialization = get_network_operators(vars, real_coded)
+    enemy_folder = get_subfoldername(enemy_subfoldername, real_coded)
+
+    curriculum_scheduler = CurriculumScheduler(copter_curriculum_stages, copter_curriculum_patience) if curriculum else None
+    fitness_function = get_fitness_function(CopterFitnessFunction(curriculum=curriculum_scheduler, opponent_subfoldername=enemy_folder), parallel, racing)
+    if pre_screening:
+        fitness_function = MultiFidelityFitnessFunction(CopterFitnessFunction(low_fidelity_profile, opponent_subfoldername=enemy_folder),
+                                                        fitness_function,
+                                                        pre_screening_full_evaluations,
+                                                        pre_screening_exploration_evaluations)
+
+    return GeneticAlgorithm(80,
+                            fitness_function,
+                            TournamentSelection(0.75, 3),
+                            crossover,
+                            mutation,
+                            Elitism(1),
+                            decoding,
+                            initialization,
+                            matrix_population=real_coded,
+                            fitness_cache=FitnessCache(80, GENERATION_SCOPE),
+                            surrogate_filter=get_surrogate_filter(get_subfoldername(copter_subfoldername, real_coded)) if surrogate else None,
+                            curriculum=curriculum_scheduler)
+
+def get_copter_island_subfoldername(island_index):
+    return copter_subfoldername + "_island_" + str(island_index)
+
+def create_copter_island(island_index):
+    return get_copter_genetic_algorithm()
+
+def run_evolution_on_copter_islands(number_of_islands=4, migration_interval=10, number_of_migrants=2, topology=RING_TOPOLOGY):
+    """
+    Evolves the copter on a number of islands in separate processes (see genetic.island),
+    each saving its population data in its own subfolder
+    """
+    s.end_when_copter_dies = True
+    s.end_when_enemy_dies = False
+    s.end_when_all_enemies_die = False
+
+    def copter_island_callback(island_index, p):
+        save_population_data(get_copter_island_subfoldername(island_index), p, keep_last_n=10)
+        average_fitness = sum(p.fitness_scores) / len(p.fitness_scores)
+        print "\n[ Island " + str(island_index) + ", " + str(p.generation) + ": " + str(
+            p.best_fitness) + " : " + str(
+            average_fitness) + " ]\n"
+
+    vars = neural_net_integration.get_number_of_variables()
+    population_data_list = [load_network_population_data(get_copter_island_subfoldername(i), vars) for i in range(number_of_islands)]
+    islands = IslandModel(create_copter_island, number_of_islands, migration_interval, number_of_migrants, topology)
+    islands.run(None, copter_island_callback, population_data_list)
+
+def run_steady_state_evolution_on_copter(replacement=REPLACE_WORST):
+    """
+    Evolves the copter with a steady-state algorithm (see genetic.steady_state), evaluating one individual per process
+    and breeding a new one as soon as an evaluation is done, instead of waiting for the longest episode of each generation
+    """
+    s.end_when_copter_dies = True
+    s.end_when_enemy_dies = False
+    s.end_when_all_enemies_die = False
+
+    vars = neural_net_integration.get_number_of_variables()
+    crossover, mutation, decoding, initialization = get_network_operators(vars)
+
+    fitness_function = ParallelFitnessFunction(CopterFitnessFunction(), worker_initializer=initialize_simulation)
+    ga = SteadyStateGeneticAlgorithm(80,
+                                     fitness_function,
+                                     TournamentSelection(0.75, 3),
+                                     crossover,
+                                     mutation,
+                                     decoding,
+                                     initialization,
+                                     replacement)
+
+    def copter_callback(p):
+        save_population_data(copter_subfoldername, p, keep_last_n=10)
+        average_fitness = sum(p.fitness_scores) / len(p.fitness_scores)
+        print "\n[ " + str(p.generation) + ": " + str(
+            p.best_fitness) + " : " + str(
+            average_fitness) + " ]\n"
+
+    copter_population_data = load_network_population_data(copter_subfoldername, vars)
+    ga.run(None, copter_callback, population_data=copter_population_data)
+
+def run_evolution_strategy_on_copter(parallel=True):
+    """
+    Trains the copter network with an evolution strategy (see genetic.evolution_strategies), starting from the best
+    network of the latest genetic algorithm checkpoint if there is one. The checkpoints only contain the network weights,
+    the optimizer state and the (offset, scale) pairs of the generation, so all of them are kept.
+    """
+    s.end_when_copter_dies = True
+    s.end_when_enemy_dies = False
+    s.end_when_all_enemies_die = False
+
+    vars = neural_net_integration.get_number_of_variables()
+    copter_population_data = load_population_data(copter_subfoldername, -1)
+    if copter_population_data is not None:
+        initial_parameters = copter_population_data.best_variables
+    else:
+        initial_parameters = np.random.normal(0, 0.5, vars)
+    es = EvolutionStrategy(CopterFitnessFunction(), initial_parameters, 40, 0.05, 0.01, NoiseTable(), weight_decay=0.005,
+                           parallel=parallel, worker_initializer=initialize_simulation)
+
+    def copter_callback(p):
+        save_population_data(copter_evolution_strategy_subfoldername, p)
+        average_fitness = sum(p.fitness_scores) / len(p.fitness_scores)
+        print "\n[ " + str(p.generation) + ": " + str(
+            p.best_fitness) + " : " + str(
+            average_fitness) + " ]\n"
+
+    es.run(None, copter_callback, load_population_data(copter_evolution_strategy_subfoldername, -1))
+
+def run_evolution_on_copter(parallel=False, racing=False, pre_screening=False, surrogate=False, curriculum=False, real_coded=False):
 
     # enemy_population_data = load_population_data(enemy_subfoldername, -1)
     # enemy_neural_net_integration.set_weights_and_possibly_initial_h(enemy_population_data.best_variables)
@@ -566,33 +929,31 @@ def run_evolution_on_copter():
     s.end_when_enemy_dies = False
     s.end_when_all_enemies_die = False
 
-    vars = neural_net_integration.get_number_of_variables()
-    var_size = 30
-    m = vars * var_size
-
-    ga = GeneticAlgorithm(80,
-                          CopterFitnessFunction(),
-                          TournamentSelection(0.75, 3),
-                          SinglePointCrossover(0.9),
-                          get_custom_mutation(m),
-                          Elitism(1),
-                          BinaryDecoding(5, vars, var_size),
-                          BinaryInitialization(m))
+    ga = get_copter_genetic_algorithm(parallel, racing, pre_screening, surrogate, curriculum, real_coded)
+    subfoldername = get_subfoldername(copter_subfoldername, real_coded)
 
     def copter_callback(p, watch_only=False):
         # if p.generation == 100:
         if not watch_only:
-            save_population_data(copter_subfoldername, p, keep_last_n=10)
+            save_population_data(subfoldername, p, keep_last_n=10)
         average_fitness = sum(p.fitness_scores) / len(p.fitness_scores)
         print "\n[ " + str(p.generation) + ": " + str(
             p.best_fitness) + " : " + str(
             average_fitness) + " ]\n"
+        if pre_screening:
+            print "Pre-screening calibration: " + ga.fitness_function.calibration_report(1) + "\n"
+        elif racing:
+            print_racing_report(p)
+        if surrogate:
+            print "Surrogate: " + ga.surrogate_filter.report(1) + "\n"
+        if curriculum:
+            print "Curriculum stage: " + str(p.curriculum_stage + 1) + " of " + str(len(ga.curriculum.stages)) + "\n"
         # if watch_only or (graphics is not None and p.generation % 10 == 0):
         #     fitness = run_copter_evaluation(p.best_variables, True)
         #     print "Fitness: " + str(fitness)
 
     watch_only = False
-    copter_population_data = load_population_data(copter_subfoldername, -1)
+    copter_population_data = load_network_population_data(subfoldername, neural_net_integration.get_number_of_variables(), real_coded)
     # g = copter_population_data.best_individual_genes
 
     if True:
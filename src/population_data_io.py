@@ -1,7 +1,9 @@
 import pickle
 import os
+import numpy as np
 
-from genetic.algorithm import PrunedPopulationData
+from genetic.algorithm import PopulationData, PrunedPopulationData
+from genetic.population import column_views
 
 def get_main_dir():
     directory_path = "saved_populations/"
@@ -67,6 +69,42 @@ def load_population_data(subfoldername, generation):
         with open(directory_path + str(generation) + ".pkl") as file:
             return pickle.load(file)
 
+def iterate_population_data(subfoldername):
+    """
+    Yields the population data of all saved generations (not the pruned ones) in the subfolder, in order
+    """
+    directory_path = get_main_dir() + subfoldername + "/"
+    if not os.path.exists(directory_path):
+        return
+    nums = sorted(int(f[:-4]) for f in os.listdir(directory_path) if f[-4:]==".pkl")
+    for num in nums:
+        try:
+            with open(directory_path + str(num) + ".pkl") as file:
+                yield pickle.load(file)
+        except ValueError:
+            print "ValueError on " + str(num) + ", skipping it!"
+
+def real_coded_population_data(population_data, real_number_decoding, dtype=np.float32):
+    """
+    Returns a copy of the population data with a population matrix of real-coded genes that the real_number_decoding
+    decodes to the decoded variables of the original (for instance binary-coded) population, rounded to the dtype
+    """
+    population = np.vstack([np.ravel(real_number_decoding.encode(variables)) for variables in population_data.decoded_variable_vectors]).astype(dtype)
+    return PopulationData(population_data.generation, population, column_views(real_number_decoding.decode_batch(population)),
+                          list(population_data.fitness_scores), population_data.best_individual_index,
+                          population_data.cache_hits, population_data.cache_misses, population_data.evaluated_fractions,
+                          population_data.curriculum_stage, population_data.timings,
+                          population_data.evaluation_cost, population_data.saved_evaluation_cost)
+
+def convert_to_real_coded(subfoldername, real_coded_subfoldername, real_number_decoding, dtype=np.float32):
+    """
+    Saves a real-coded copy (see real_coded_population_data) of each saved generation (not the pruned ones)
+    in the subfolder in another subfolder, so that a real-coded run can continue where the original run is
+    """
+    for population_data in iterate_population_data(subfoldername):
+        save_population_data(real_coded_subfoldername, real_coded_population_data(population_data, real_number_decoding, dtype))
+        print "Converted generation " + str(population_data.generation) + " of " + str(subfoldername)
+
 
 if __name__ == "__main__":
     import numpy as np
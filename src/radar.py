@@ -61,6 +61,17 @@ class Radar:
         self.point = None
         self.dist = None
 
+    def set_x_step_size(self, x_step_size):
+        """
+        Changes the resolution of the radar, keeping its range
+        """
+        scale = float(x_step_size) / self.x_step_size
+        self.max_steps = int(round(self.max_steps / scale))
+        self.step = self.step * scale
+        self.single_pixel_fraction = 1.0 / x_step_size
+        self.x_step_size = x_step_size
+        self.step_dist = np.linalg.norm(self.step)
+
     def read(self, position, level):
         p = np.copy(position)
         for n in range(1,self.max_steps+1):
@@ -1,3 +1,33 @@
-from copter_simulation import run_evolution_on_copter
+import argparse
 
-run_evolution_on_copter()
\ No newline at end of file
+from copter_simulation import run_evolution_on_copter, run_evolution_on_copter_islands, run_steady_state_evolution_on_copter, \
+    run_evolution_strategy_on_copter, convert_checkpoints_to_real_coded
+from genetic.island import RING_TOPOLOGY, FULLY_CONNECTED_TOPOLOGY
+from genetic.steady_state import REPLACE_WORST, TOURNAMENT_REPLACEMENT
+
+parser = argparse.ArgumentParser(description="Evolves the copter network, by default with a generational genetic algorithm")
+mode = parser.add_mutually_exclusive_group()
+mode.add_argument("--islands", type=int, metavar="NUMBER", help="evolve on this number of islands in separate processes")
+mode.add_argument("--steady-state", action="store_true", help="evolve with a steady-state genetic algorithm")
+mode.add_argument("--evolution-strategy", action="store_true", help="train with an evolution strategy, starting from the best network of the genetic algorithm")
+mode.add_argument("--convert-checkpoints", action="store_true", help="convert the saved binary-coded copter and enemy populations to real-coded ones, and exit")
+parser.add_argument("--parallel", action="store_true", help="evaluate the individuals in a pool of processes")
+parser.add_argument("--racing", action="store_true", help="stop evaluating the individuals that can no longer reach the top of the population")
+parser.add_argument("--pre-screening", action="store_true", help="evaluate on short levels first, and only the best on the full levels")
+parser.add_argument("--surrogate", action="store_true", help="skip the individuals that a surrogate model predicts to be bad")
+parser.add_argument("--curriculum", action="store_true", help="make the levels harder as the best fitness improves")
+parser.add_argument("--real-coded", action="store_true", help="evolve real-coded chromosomes (see --convert-checkpoints)")
+parser.add_argument("--topology", choices=(RING_TOPOLOGY, FULLY_CONNECTED_TOPOLOGY), default=RING_TOPOLOGY, help="the migration topology of the islands")
+parser.add_argument("--replacement", choices=(REPLACE_WORST, TOURNAMENT_REPLACEMENT), default=REPLACE_WORST, help="the replacement of the steady-state genetic algorithm")
+args = parser.parse_args()
+
+if args.convert_checkpoints:
+    convert_checkpoints_to_real_coded()
+elif args.islands is not None:
+    run_evolution_on_copter_islands(args.islands, topology=args.topology)
+elif args.steady_state:
+    run_steady_state_evolution_on_copter(args.replacement)
+elif args.evolution_strategy:
+    run_evolution_strategy_on_copter()
+else:
+    run_evolution_on_copter(args.parallel, args.racing, args.pre_screening, args.surrogate, args.curriculum, args.real_coded)
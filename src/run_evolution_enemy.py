@@ -1,3 +1,16 @@
-from copter_simulation import run_evolution_on_enemy
+import argparse
 
-run_evolution_on_enemy()
\ No newline at end of file
+from copter_simulation import run_evolution_on_enemy, convert_checkpoints_to_real_coded
+
+parser = argparse.ArgumentParser(description="Evolves the enemy network with a generational genetic algorithm")
+parser.add_argument("--parallel", action="store_true", help="evaluate the individuals in a pool of processes")
+parser.add_argument("--racing", action="store_true", help="stop evaluating the individuals that can no longer reach the top of the population")
+parser.add_argument("--surrogate", action="store_true", help="skip the individuals that a surrogate model predicts to be bad")
+parser.add_argument("--real-coded", action="store_true", help="evolve real-coded chromosomes (see --convert-checkpoints)")
+parser.add_argument("--convert-checkpoints", action="store_true", help="convert the saved binary-coded copter and enemy populations to real-coded ones, and exit")
+args = parser.parse_args()
+
+if args.convert_checkpoints:
+    convert_checkpoints_to_real_coded()
+else:
+    run_evolution_on_enemy(args.parallel, args.racing, args.surrogate, args.real_coded)
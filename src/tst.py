@@ -32,6 +32,6 @@ def callback(p):
         print str(p.generation) + ": " + str(p.best_fitness)
         print p.best_variables
 ga.run(100, callback)
-print "Average fitness over 200 runs:" + str(average_fitness(ga, 100, 200))
+print "Average fitness over 200 runs:" + str(average_fitness(ga, 100, 200, parallel=True, seed=0))
 
 # print "Average fitness over 200 runs:" + str(plot_fitness_curves(ga, 100, 200))
\ No newline at end of file